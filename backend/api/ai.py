@@ -1,6 +1,11 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 from psycopg2.extras import RealDictCursor
+import json
+import time
+from helper_functions import convert_dict_dates_to_iso8601
 from utils.utilities import token_required, get_db_connection
+from utils.db_pool import release_db_connection, pooled_connection
+from utils.sql_loader import load_sql_query, execute_query
 from services.ai_service import (
     fitness_ai_agent,
     get_user_profile,
@@ -8,12 +13,120 @@ from services.ai_service import (
     get_user_strength_progress,
     save_ai_workout_plan,
     get_recent_soreness_data,
-    save_ai_conversation,
-    update_workout_plan_feedback
+    update_workout_plan_feedback,
+    fetch_user_context
+)
+from services.ai_job_queue import ai_job_queue, JobQueueFull, JobLimitReached
+from services.ai_context_cache import ai_context_cache
+from services.conversation_memory import (
+    load_conversation,
+    new_conversation,
+    conversation_messages,
+    save_turn,
+    compact_in_background
 )
 
 ai_bp = Blueprint('ai', __name__)
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+
+
+# The queries behind each kind of AI call, run side by side on a cache miss
+_CONTEXT_QUERIES = {
+    'workout': {
+        'profile': get_user_profile,
+        'workout_history': lambda user_id, cur: get_user_workout_history(user_id, cur, limit=10),
+        'strength_progress': get_user_strength_progress,
+        'recent_soreness': get_recent_soreness_data,
+    },
+    'chat': {
+        'profile': get_user_profile,
+        'workout_history': lambda user_id, cur: get_user_workout_history(user_id, cur, limit=5),
+        'strength_progress': get_user_strength_progress,
+    },
+    'deload': {
+        'profile': get_user_profile,
+        'workout_history': lambda user_id, cur: get_user_workout_history(user_id, cur, limit=20),
+    },
+}
+
+
+def _load_context(user_id, kind):
+    parts = fetch_user_context(user_id, _CONTEXT_QUERIES[kind])
+    if kind == 'workout':
+        return parts
+    # chat and deload prompts are built from the whole snapshot, so render it once here
+    user_data = {**parts.pop('profile'), **parts}
+    return {'user_data': user_data, 'user_context': fitness_ai_agent._build_user_context(user_data)}
+
+
+def _user_context(user_id, kind):
+    """
+    Cached context snapshot for one kind of AI call; the database is only
+    touched on a miss. Snapshots are shared between requests, so treat them
+    as read-only.
+    """
+    return ai_context_cache.get_or_load(user_id, kind, lambda: _load_context(user_id, kind))
+
+
+def _build_workout_inputs(user_id, data):
+    """Returns (user_data, workout_request) for the agent from the user's cached context."""
+    context = _user_context(user_id, 'workout')
+    profile = context['profile']
+    workout_history = context['workout_history']
+    strength_progress = context['strength_progress']
+    recent_soreness = context['recent_soreness']
+
+    # Build user data
+    user_data = {
+        'user_id': user_id,
+        'name': profile.get('name'),
+        'fitness_level': profile.get('fitness_level', 'intermediate'),
+        'age': profile.get('age'),
+        'weight': profile.get('weight_lb'),
+        'height': profile.get('height_in'),
+        'goals': [profile.get('main_focus')] if profile.get('main_focus') else [],
+        'injuries': profile.get('injuries'),
+        'available_equipment': profile.get('available_equipment', []),
+        'workout_days': profile.get('preferred_workout_days', 3),
+        'workout_history': workout_history,
+        'strength_progress': strength_progress,
+        'fatigue_level': data.get('fatigue_level', 5),
+        'soreness': data.get('soreness', recent_soreness),
+        'energy_level': data.get('energy_level', 'moderate')
+    }
+
+    workout_request = {
+        'goal': data.get('goal', profile.get('main_focus', 'general fitness')),
+        'focus_areas': data.get('focus_areas', ['full body']),
+        'duration_minutes': data.get('duration_minutes', 45),
+        'energy_level': data.get('energy_level', 'moderate')
+    }
+
+    return user_data, workout_request
+
+
+def _run_personalized_workout_job(user_id, data):
+    """Background version of /personalized-workout; holds a pooled connection
+    only for the reads and the final write, not during the model call."""
+    user_data, workout_request = _build_workout_inputs(user_id, data)
+
+    result = fitness_ai_agent.generate_personalized_workout(user_data, workout_request)
+
+    if result['success']:
+        with pooled_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                result['plan_id'] = save_ai_workout_plan(
+                    user_id,
+                    workout_request['goal'],
+                    result['workout'],
+                    cur
+                )
+            conn.commit()
+
+    return result
+
 
 @ai_bp.route('/personalized-workout', methods=['POST'])
 @token_required
@@ -23,44 +136,23 @@ def generate_personalized_workout(user_id):
     try:
         data = request.get_json()
 
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-
-        # Fetch complete user context
-        profile = get_user_profile(user_id, cur)
-        workout_history = get_user_workout_history(user_id, cur, limit=10)
-        strength_progress = get_user_strength_progress(user_id, cur)
-        recent_soreness = get_recent_soreness_data(user_id, cur)
-
-        # Build user data
-        user_data = {
-            'user_id': user_id,
-            'name': profile.get('name'),
-            'fitness_level': profile.get('fitness_level', 'intermediate'),
-            'age': profile.get('age'),
-            'weight': profile.get('weight_lb'),
-            'height': profile.get('height_in'),
-            'goals': [profile.get('main_focus')] if profile.get('main_focus') else [],
-            'injuries': profile.get('injuries'),
-            'available_equipment': profile.get('available_equipment', []),
-            'workout_days': profile.get('preferred_workout_days', 3),
-            'workout_history': workout_history,
-            'strength_progress': strength_progress,
-            'fatigue_level': data.get('fatigue_level', 5),
-            'soreness': data.get('soreness', recent_soreness),
-            'energy_level': data.get('energy_level', 'moderate')
-        }
+        # Async mode: queue the job and let the client poll /jobs/<job_id>
+        if data.get('async'):
+            try:
+                job = ai_job_queue.submit(
+                    user_id, 'personalized-workout', _run_personalized_workout_job, user_id, data
+                )
+            except (JobQueueFull, JobLimitReached) as e:
+                return jsonify({"success": False, "error": str(e)}), 429
+            return jsonify({"success": True, **job, "status_url": f"/api/ai/jobs/{job['job_id']}"}), 202
 
-        workout_request = {
-            'goal': data.get('goal', profile.get('main_focus', 'general fitness')),
-            'focus_areas': data.get('focus_areas', ['full body']),
-            'duration_minutes': data.get('duration_minutes', 45),
-            'energy_level': data.get('energy_level', 'moderate')
-        }
+        user_data, workout_request = _build_workout_inputs(user_id, data)
 
         result = fitness_ai_agent.generate_personalized_workout(user_data, workout_request)
 
         if result['success']:
+            conn = get_db_connection()
+            cur = conn.cursor(cursor_factory=RealDictCursor)
             plan_id = save_ai_workout_plan(
                 user_id,
                 workout_request['goal'],
@@ -86,6 +178,16 @@ def generate_personalized_workout(user_id):
             conn.close()
 
 
+@ai_bp.route('/jobs/<job_id>', methods=['GET'])
+@token_required
+def get_ai_job(user_id, job_id):
+    """Status of a queued AI job; includes the result once it has finished."""
+    job = ai_job_queue.get(job_id, user_id)
+    if not job:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, **job}), 200
+
+
 @ai_bp.route('/analyze-workout', methods=['POST'])
 @token_required
 def analyze_completed_workout(user_id):
@@ -130,30 +232,31 @@ def chat_with_trainer(user_id):
     try:
         data = request.get_json()
 
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        # Follow-up turns are served from the cached snapshot without a database round trip
+        context = _user_context(user_id, 'chat')
 
-        profile = get_user_profile(user_id, cur)
-        workout_history = get_user_workout_history(user_id, cur, limit=5)
-        strength_progress = get_user_strength_progress(user_id, cur)
+        conversation, error = _open_conversation(user_id, data)
+        if error:
+            return jsonify({"success": False, "error": error}), 404
 
-        user_data = {
-            **profile,
-            'workout_history': workout_history,
-            'strength_progress': strength_progress
-        }
+        # Streaming mode: send tokens as Server-Sent Events
+        if data.get('stream') or request.accept_mimetypes.best == 'text/event-stream':
+            return _stream_chat_response(user_id, data, context, conversation)
 
         result = fitness_ai_agent.chat_with_trainer(
-            user_data=user_data,
+            user_data=context['user_data'],
             message=data.get('message'),
-            conversation_history=data.get('conversation_history', [])
+            **_chat_history_kwargs(data, conversation),
+            user_context=context['user_context']
         )
 
         # Save conversation (skip if marked as system prompt)
-        if result['success']:
-            save_to_history = data.get('save_to_history', True)
-            save_ai_conversation(user_id, data.get('message'), result['response'], cur, save_to_history=save_to_history)
+        if result['success'] and conversation:
+            conn = get_db_connection()
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            result['conversation_id'] = save_turn(cur, user_id, conversation, data.get('message'), result['response'])
             conn.commit()
+            compact_in_background(conversation)
 
         return jsonify(result), 200 if result['success'] else 500
 
@@ -171,25 +274,116 @@ def chat_with_trainer(user_id):
             conn.close()
 
 
+def _open_conversation(user_id, data):
+    """
+    The server-side thread this message belongs to: `conversation_id` if
+    given, a fresh one for `new_conversation`, else the user's latest. Turns
+    marked save_to_history=false don't use a thread. Returns (conversation, error).
+    """
+    if not data.get('save_to_history', True):
+        return None, None
+    if data.get('new_conversation'):
+        return new_conversation(), None
+
+    conversation_id = data.get('conversation_id')
+    conn = get_db_connection()
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        conversation = load_conversation(cur, user_id, conversation_id)
+    conn.commit()
+    # don't hold a pooled connection while the model is talking
+    release_db_connection()
+
+    if conversation is None:
+        if conversation_id is not None:
+            return None, "Conversation not found"
+        return new_conversation(), None
+    return conversation, None
+
+
+def _chat_history_kwargs(data, conversation):
+    """History comes from the server thread; only threadless requests still send their own."""
+    if conversation is None:
+        return {'conversation_history': data.get('conversation_history', [])}
+    return {
+        'conversation_history': conversation_messages(conversation),
+        'conversation_summary': conversation['summary']
+    }
+
+
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def _stream_chat_response(user_id, data, context, conversation):
+    """Streams the trainer's reply, then saves the full response once the stream completes."""
+    message = data.get('message')
+
+    def generate():
+        started = time.monotonic()
+        first_token_at = None
+        parts = []
+        usage = {}
+        try:
+            for delta in fitness_ai_agent.stream_chat_with_trainer(
+                user_data=context['user_data'],
+                message=message,
+                **_chat_history_kwargs(data, conversation),
+                user_context=context['user_context'],
+                usage=usage
+            ):
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                parts.append(delta)
+                yield _sse('token', {'content': delta})
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield _sse('error', {'success': False, 'error': str(e)})
+            return
+
+        response = "".join(parts)
+        ttft_ms = int((first_token_at - started) * 1000) if first_token_at else None
+        total_ms = int((time.monotonic() - started) * 1000)
+        print(f"AI chat stream: user_id={user_id} ttft_ms={ttft_ms} total_ms={total_ms} "
+              f"prompt_tokens={usage.get('prompt_tokens')} cached_input_tokens={usage.get('cached_input_tokens')}")
+
+        conversation_id = None
+        if conversation:
+            conn = None
+            cur = None
+            try:
+                conn = get_db_connection()
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                conversation_id = save_turn(cur, user_id, conversation, message, response)
+                conn.commit()
+            except Exception as e:
+                if conn:
+                    conn.rollback()
+                yield _sse('error', {'success': False, 'error': f'Failed to save conversation: {str(e)}'})
+                return
+            finally:
+                if cur:
+                    cur.close()
+            compact_in_background(conversation)
+
+        yield _sse('done', {'success': True, 'response': response, 'ttft_ms': ttft_ms, 'total_ms': total_ms,
+                            'usage': usage, 'conversation_id': conversation_id})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @ai_bp.route('/check-deload', methods=['GET'])
 @token_required
 def check_deload(user_id):
     """Check if user needs a deload week"""
-    conn = None
-    cur = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-
-        profile = get_user_profile(user_id, cur)
-        workout_history = get_user_workout_history(user_id, cur, limit=20)
-
-        user_data = {
-            **profile,
-            'workout_history': workout_history
-        }
+        context = _user_context(user_id, 'deload')
 
-        result = fitness_ai_agent.suggest_deload_week(user_data)
+        result = fitness_ai_agent.suggest_deload_week(context['user_data'], context['user_context'])
 
         return jsonify(result), 200 if result['success'] else 500
 
@@ -198,12 +392,6 @@ def check_deload(user_id):
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 500
 
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-
 
 @ai_bp.route('/workout-feedback', methods=['POST'])
 @token_required
@@ -238,4 +426,183 @@ def submit_workout_feedback(user_id):
         if cur:
             cur.close()
         if conn:
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+
+def _page_args():
+    """Reads ?before=<id>&limit=<n> for keyset pagination. Returns (before, limit, error)."""
+    try:
+        before = request.args.get('before', type=int)
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return None, None, "'limit' must be an integer"
+    return before, limit, None
+
+
+def _conversation_page(cur, user_id, conversation_id, before, limit):
+    """One page of a thread's turns, newest page first, chronological within the page."""
+    execute_query(cur, 'select_ai_user_conversations.sql', (conversation_id, user_id, before, before, limit))
+    turns = cur.fetchall()
+    next_before = turns[-1]['id'] if len(turns) == limit else None
+    return list(reversed(turns)), next_before
+
+
+@ai_bp.route('/conversations', methods=['GET'])
+@token_required
+def list_conversations(user_id):
+    """The user's conversation threads, newest first. Page with ?before=<next_before>."""
+    conn = None
+    cur = None
+    try:
+        before, limit, error = _page_args()
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        execute_query(cur, 'select_ai_conversation_threads.sql', (user_id, before, before, limit))
+        threads = cur.fetchall()
+
+        return jsonify({
+            "success": True,
+            "conversations": convert_dict_dates_to_iso8601(threads),
+            "next_before": threads[-1]['id'] if len(threads) == limit else None
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+@ai_bp.route('/conversations/<int:conversation_id>/messages', methods=['GET'])
+@token_required
+def get_conversation_messages(user_id, conversation_id):
+    """A page of turns from one thread. Page backwards with ?before=<next_before>."""
+    conn = None
+    cur = None
+    try:
+        before, limit, error = _page_args()
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        turns, next_before = _conversation_page(cur, user_id, conversation_id, before, limit)
+
+        return jsonify({
+            "success": True,
+            "conversation_id": conversation_id,
+            "turns": convert_dict_dates_to_iso8601(turns),
+            "next_before": next_before
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+@ai_bp.route('/conversation-history', methods=['GET'])
+@token_required
+def get_conversation_history(user_id):
+    """
+    The chat screen's view of a thread (?conversation_id=, default the most recently active)
+    as user/assistant messages, most recent page first.
+    """
+    conn = None
+    cur = None
+    try:
+        before, limit, error = _page_args()
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        conversation_id = request.args.get('conversation_id', type=int)
+        if conversation_id is None:
+            # the thread /chat continues when no conversation_id is sent
+            cur.execute(load_sql_query('select_latest_ai_conversation_id.sql'), (user_id,))
+            latest = cur.fetchone()
+            conversation_id = latest['id'] if latest else None
+
+        messages = []
+        next_before = None
+        if conversation_id is not None:
+            turns, next_before = _conversation_page(cur, user_id, conversation_id, before, limit)
+            for turn in convert_dict_dates_to_iso8601(turns):
+                messages.append({'role': 'user', 'content': turn['message'], 'timestamp': turn['created_at']})
+                messages.append({'role': 'assistant', 'content': turn['response'], 'timestamp': turn['created_at']})
+
+        return jsonify({
+            "success": True,
+            "conversation_id": conversation_id,
+            "messages": messages,
+            "next_before": next_before
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+@ai_bp.route('/conversations/<int:conversation_id>', methods=['DELETE'])
+@token_required
+def delete_conversation(user_id, conversation_id):
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute(load_sql_query('delete_ai_conversation_thread.sql'), (conversation_id, user_id))
+        deleted = cur.fetchone()
+        if not deleted:
+            return jsonify({"success": False, "error": "Conversation not found"}), 404
+        conn.commit()
+
+        return jsonify({"success": True, "deleted_count": deleted['turn_count']}), 200
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+@ai_bp.route('/conversations', methods=['DELETE'])
+@token_required
+def delete_all_conversations(user_id):
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute(load_sql_query('delete_ai_user_conversations.sql'), (user_id, user_id))
+        deleted_count = cur.rowcount
+        conn.commit()
+
+        return jsonify({"success": True, "deleted_count": deleted_count}), 200
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
@@ -0,0 +1,149 @@
+import datetime
+from flask import Blueprint, jsonify, request
+from psycopg2.extras import RealDictCursor
+from helper_functions import convert_dict_dates_to_iso8601
+from utils.utilities import token_required, get_db_connection
+from utils.sql_loader import execute_query
+
+analytics_bp = Blueprint('analytics', __name__)
+
+MAX_DAILY_RANGE_DAYS = 366
+MAX_WEEKLY_RANGE_DAYS = 5 * 366
+
+
+def _local_today(cur, user_id):
+    """Today in the user's timezone, which is how the rollups key their days."""
+    execute_query(cur, 'select_user_local_date.sql', (user_id,))
+    return cur.fetchone()['today']
+
+
+def _date_range(cur, user_id, default_days, max_days):
+    """
+    Reads ?from=YYYY-MM-DD&to=YYYY-MM-DD, defaulting to the last `default_days`
+    days up to the user's local today. Returns (start, end, error).
+    """
+    try:
+        end = datetime.date.fromisoformat(request.args['to']) if request.args.get('to') else None
+        start = datetime.date.fromisoformat(request.args['from']) if request.args.get('from') else None
+    except ValueError:
+        return None, None, "Dates must be YYYY-MM-DD"
+    if end is None:
+        end = _local_today(cur, user_id)
+    if start is None:
+        start = end - datetime.timedelta(days=default_days - 1)
+    if start > end:
+        return None, None, "'from' must not be after 'to'"
+    if (end - start).days >= max_days:
+        return None, None, f"Date range is limited to {max_days} days"
+    return start, end, None
+
+
+def _rollup_row(row):
+    row = dict(row)
+    for key in ('day', 'week_start'):
+        if key in row:
+            row[key] = row[key].isoformat()
+    row['volume_lb'] = float(row['volume_lb'])
+    row['volume_by_category'] = {k: float(v) for k, v in (row['volume_by_category'] or {}).items()}
+    return row
+
+
+# GET per-day training totals
+@analytics_bp.route('/daily', methods=['GET'])
+@token_required
+def get_daily_training(user_id):
+    """Per-day sessions, sets, reps, volume, duration and calories for a date range."""
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        start, end, error = _date_range(cur, user_id, 30, MAX_DAILY_RANGE_DAYS)
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        execute_query(cur, 'select_daily_training.sql', (user_id, start, end))
+        days = [_rollup_row(row) for row in cur.fetchall()]
+
+        return jsonify({
+            "success": True,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "days": convert_dict_dates_to_iso8601(days)
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+# GET per-ISO-week training totals
+@analytics_bp.route('/weekly', methods=['GET'])
+@token_required
+def get_weekly_training(user_id):
+    """Per-week totals; weeks are keyed by their Monday (week_start)."""
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        start, end, error = _date_range(cur, user_id, 12 * 7, MAX_WEEKLY_RANGE_DAYS)
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+        # include the week that contains 'from'
+        start = start - datetime.timedelta(days=start.weekday())
+
+        execute_query(cur, 'select_weekly_training.sql', (user_id, start, end))
+        weeks = [_rollup_row(row) for row in cur.fetchall()]
+
+        return jsonify({
+            "success": True,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "weeks": convert_dict_dates_to_iso8601(weeks)
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+# GET totals for a date range
+@analytics_bp.route('/summary', methods=['GET'])
+@token_required
+def get_training_summary(user_id):
+    """Totals and volume by exercise category across a date range."""
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        start, end, error = _date_range(cur, user_id, 30, MAX_WEEKLY_RANGE_DAYS)
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        execute_query(cur, 'select_training_summary.sql', (user_id, start, end))
+        summary = _rollup_row(cur.fetchone())
+
+        return jsonify({
+            "success": True,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "summary": summary
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
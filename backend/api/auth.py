@@ -8,6 +8,7 @@ from utils.utilities import get_db_connection, token_required
 from utils.helper_functions import calculate_age, generate_reset_token
 from utils.sql_loader import load_sql_query
 from services.challenge_service import _ensure_current_challenges
+from services.ai_context_cache import invalidate_user_context
 from services.email_service import send_email
 
 auth_bp = Blueprint('auth', __name__)
@@ -382,6 +383,16 @@ def update_user(user_id):
         # intensity
         activity_intensity = data.get('activity_intensity')
 
+        # IANA timezone (e.g. 'America/New_York'), used to count workout streak days
+        # checked against Postgres's own list: streak queries use it with AT TIME ZONE
+        timezone = data.get('timezone')
+        if timezone is not None:
+            if not isinstance(timezone, str):
+                return jsonify({'success': False, 'error': 'Invalid timezone'}), 400
+            cur.execute(load_sql_query('select_timezone_exists.sql'), (timezone,))
+            if not cur.fetchone()[0]:
+                return jsonify({'success': False, 'error': 'Invalid timezone'}), 400
+
         # 1d. Height and Weight Conversion (to Imperial)
         unit_system = data.get('unit_system', 'imperial') # Default to imperial for existing fields
         
@@ -431,6 +442,7 @@ def update_user(user_id):
                 goal_weight_lb,
                 main_focus,
                 activity_intensity,
+                timezone,
                 user_id
                 # TODO: add profile pic
             )
@@ -444,6 +456,7 @@ def update_user(user_id):
 
         user = cur.fetchone()
         conn.commit()
+        invalidate_user_context(user_id)
 
         if not user:
             return jsonify({
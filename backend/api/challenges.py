@@ -5,13 +5,28 @@ from helper_functions import convert_dict_dates_to_iso8601
 # Assuming these are now in your helper_functions or a new utils file
 # (Adjust import paths based on your actual file locations)
 from utils.utilities import token_required, get_db_connection
-from utils.sql_loader import load_sql_query
+from utils.sql_loader import execute_query
 
 # Assuming you moved the generation and update logic to services/challenge_service.py
-from services.challenge_service import _ensure_current_challenges, update_journey_master
+from services.challenge_service import _ensure_current_challenges, update_journey_master, challenge_period_keys
+from services.leaderboard_service import record_activity
+from services.challenge_progress import is_auto_tracked, AUTO_TRACKED_TITLES
 
 challenge_bp = Blueprint('challenges', __name__)
 
+
+def _challenge_row(row):
+    challenge_dict = dict(row)
+    # convert to float for json compatibility
+    if 'goal' in challenge_dict:
+        challenge_dict['goal'] = float(challenge_dict['goal'])
+    if 'current_progress' in challenge_dict:
+        challenge_dict['current_progress'] = float(challenge_dict['current_progress'])
+    # advanced by logged workouts; the client hides its manual increment
+    challenge_dict['auto_tracked'] = is_auto_tracked(challenge_dict['challenge_title'])
+    return challenge_dict
+
+
 # QUERY user challenges
 @challenge_bp.route('/', methods=['GET'])
 @token_required
@@ -25,29 +40,16 @@ def get_user_challenges(user_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
-        _ensure_current_challenges(user_id, cur)
+        period_keys = _ensure_current_challenges(user_id, cur)
         conn.commit()
 
-        get_challenges = load_sql_query('select_user_challenges.sql')
-        cur.execute(get_challenges, (user_id,))
+        execute_query(cur, 'select_user_challenges.sql', (user_id, period_keys['Daily'], period_keys['Weekly']))
         
-        challenges = cur.fetchall()
-
-        challenges_data = []
-        for row in challenges:
-            challenge_dict = dict(row)
-            
-            # convert to float for json compatibility
-            if 'goal' in challenge_dict:
-                challenge_dict['goal'] = float(challenge_dict['goal'])
-            if 'current_progress' in challenge_dict:
-                challenge_dict['current_progress'] = float(challenge_dict['current_progress'])
-            
-            challenges_data.append(challenge_dict)
+        challenges_data = [_challenge_row(row) for row in cur.fetchall()]
 
         return jsonify({
             'success': True,
-            'challenges': convert_dict_dates_to_iso8601(challenges)
+            'challenges': convert_dict_dates_to_iso8601(challenges_data)
         }), 200
 
     except Exception as e:
@@ -81,39 +83,32 @@ def update_challenge_progress(user_id, challenge_instance_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
  
-        # 1. Get current challenge state
-        select_challenge_sql = load_sql_query('select_challenge_for_update.sql')
-        cur.execute(select_challenge_sql, (challenge_instance_id, user_id))
+        # Increment (clamped to the goal) and report the completion transition in one statement
+        execute_query(cur, 'increment_challenge_progress.sql',
+                      (AUTO_TRACKED_TITLES, challenge_instance_id, user_id, increment, increment))
         challenge = cur.fetchone()
  
         if not challenge:
             return jsonify({'success': False, 'error': 'Challenge not found or does not belong to user'}), 404
+
+        if challenge['auto_tracked']:
+            # logged workouts already advance it; a manual increment would count twice
+            return jsonify({'success': False, 'error': 'Challenge progress is tracked from logged workouts'}), 409
  
-        if challenge['is_completed']:
+        if challenge['was_completed']:
             # Return a success response but indicate no change was made.
             return jsonify({'success': True, 'message': 'Challenge is already completed'}), 200
  
-        # 2. Calculate new progress and completion status
-        new_progress = challenge['current_progress'] + increment
-        is_completed = new_progress >= challenge['goal']
-        if is_completed:
-            new_progress = challenge['goal'] # Clamp progress to goal
- 
-        # 3. Update the challenge in the database
-        update_challenge_sql = load_sql_query('update_challenge_progress.sql')
-        cur.execute(update_challenge_sql, (new_progress, is_completed, challenge_instance_id, user_id))
+        # An All-Time challenge that just completed moves Journey Master, in the same transaction
+        completed_types = [challenge['challenge_type']] if challenge['just_completed'] else []
+        if (challenge['just_completed'] and challenge['challenge_type'] == 'All-Time'
+                and challenge['challenge_title'] != 'Journey Master'):
+            if update_journey_master(user_id, cur):
+                completed_types.append('All-Time')
+        record_activity(cur, user_id, completed_challenge_types=completed_types)
  
         conn.commit()
  
-        # 4. If an All-Time challenge was just completed, update Journey Master
-        if is_completed:
-            select_challenge_type_sql = load_sql_query('select_challenge_type.sql')
-            cur.execute(select_challenge_type_sql, (challenge_instance_id,))
-            challenge_type = cur.fetchone()['challenge_type']
-            if challenge_type == 'All-Time':
-                update_journey_master(user_id, cur)
-                conn.commit()
- 
         return jsonify({
             'success': True,
             'message': 'Challenge progress updated successfully'
@@ -130,4 +125,85 @@ def update_challenge_progress(user_id, challenge_instance_id):
         if cur:
             cur.close()
         if conn:
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+# APPLY several progress increments at once
+MAX_BATCH_INCREMENTS = 50
+
+@challenge_bp.route('/batch', methods=['PUT'])
+@token_required
+def update_challenges_progress_batch(user_id):
+    """
+    Applies a list of {challenge_id, increment} entries in one transaction and
+    returns the user's current challenges. Repeated ids are summed.
+    """
+    conn = None
+    cur = None
+    try:
+        data = request.get_json()
+        items = data.get('increments')
+        if not isinstance(items, list) or not items:
+            return jsonify({'success': False, 'error': 'increments must be a non-empty list'}), 400
+        if len(items) > MAX_BATCH_INCREMENTS:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_INCREMENTS} increments per batch'}), 400
+
+        totals = {}
+        for item in items:
+            challenge_id = item.get('challenge_id') if isinstance(item, dict) else None
+            increment = item.get('increment', 1) if isinstance(item, dict) else None
+            if (not isinstance(challenge_id, int) or isinstance(challenge_id, bool)
+                    or not isinstance(increment, (int, float)) or isinstance(increment, bool) or increment <= 0):
+                return jsonify({'success': False, 'error': 'Each entry needs an integer challenge_id and a positive increment'}), 400
+            totals[challenge_id] = totals.get(challenge_id, 0) + increment
+
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        execute_query(cur, 'increment_challenges_batch.sql',
+                      (list(totals), list(totals.values()), AUTO_TRACKED_TITLES, user_id))
+        rows = {row['id']: row for row in cur.fetchall()}
+
+        completed_types = [row['challenge_type'] for row in rows.values() if row['just_completed']]
+        if any(row['just_completed'] and row['challenge_type'] == 'All-Time'
+               and row['challenge_title'] != 'Journey Master' for row in rows.values()):
+            if update_journey_master(user_id, cur):
+                completed_types.append('All-Time')
+        record_activity(cur, user_id, completed_challenge_types=completed_types)
+
+        conn.commit()
+
+        results = []
+        for challenge_id in totals:
+            row = rows.get(challenge_id)
+            if row is None:
+                status = 'not_found'
+            elif row['auto_tracked']:
+                status = 'auto_tracked'
+            elif row['was_completed']:
+                status = 'already_completed'
+            else:
+                status = 'completed' if row['just_completed'] else 'updated'
+            results.append({'challenge_id': challenge_id, 'status': status})
+
+        period_keys = challenge_period_keys()
+        execute_query(cur, 'select_user_challenges.sql', (user_id, period_keys['Daily'], period_keys['Weekly']))
+        challenges = [_challenge_row(row) for row in cur.fetchall()]
+
+        return jsonify({
+            'success': True,
+            'results': results,
+            'challenges': convert_dict_dates_to_iso8601(challenges)
+        }), 200
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to update challenges: {str(e)}'}), 500
+
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
@@ -0,0 +1,82 @@
+from flask import Blueprint, jsonify, request
+from psycopg2.extras import RealDictCursor
+from helper_functions import convert_dict_dates_to_iso8601
+from utils.utilities import token_required, get_db_connection
+from services.leaderboard_service import get_top, get_neighbours
+
+leaderboard_bp = Blueprint('leaderboard', __name__)
+
+MAX_TOP = 100
+MAX_NEIGHBOURS = 25
+
+
+# QUERY the top of the leaderboard
+@leaderboard_bp.route('/', methods=['GET'])
+@token_required
+def get_leaderboard(user_id):
+    """
+    Returns the highest-scoring users, best first.
+    """
+    conn = None
+    cur = None
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_TOP)
+
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        entries = get_top(cur, limit)
+
+        return jsonify({
+            'success': True,
+            'leaderboard': convert_dict_dates_to_iso8601(entries)
+        }), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to fetch leaderboard: {str(e)}'}), 500
+
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+# QUERY the user's position with the entries around it
+@leaderboard_bp.route('/me', methods=['GET'])
+@token_required
+def get_my_leaderboard_position(user_id):
+    """
+    Returns the user's entry plus up to `neighbours` entries above and below it.
+    """
+    conn = None
+    cur = None
+    try:
+        count = min(max(request.args.get('neighbours', 5, type=int), 0), MAX_NEIGHBOURS)
+
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        position = get_neighbours(cur, user_id, count)
+        if not position:
+            return jsonify({'success': False, 'error': 'User is not on the leaderboard'}), 404
+
+        return jsonify({
+            'success': True,
+            'me': convert_dict_dates_to_iso8601(position['me']),
+            'above': convert_dict_dates_to_iso8601(position['above']),
+            'below': convert_dict_dates_to_iso8601(position['below'])
+        }), 200
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to fetch leaderboard position: {str(e)}'}), 500
+
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
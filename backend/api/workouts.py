@@ -1,9 +1,13 @@
 from flask import Blueprint, jsonify, request
 from psycopg2.extras import RealDictCursor
 from utils.utilities import token_required, get_db_connection
-from utils.sql_loader import load_sql_query
+from utils.sql_loader import load_sql_query, execute_query
 from helper_functions import convert_dict_dates_to_iso8601
-import datetime
+from services.challenge_progress import apply_workout_progress, set_change
+from services.exercise_records import record_sets, get_records
+from services.ai_context_cache import invalidate_user_context
+from services.leaderboard_service import record_activity
+from services.analytics_service import record_session_rollups, refresh_session_rollups
 
 workouts_bp = Blueprint('workouts', __name__)
 
@@ -115,6 +119,8 @@ def create_program(user_id):
 @token_required
 def update_program(user_id, program_id):
     """Update an existing workout program."""
+    conn = None
+    cur = None
     try:
         data = request.get_json()
         name = data.get('name')
@@ -127,22 +133,13 @@ def update_program(user_id, program_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this program
-        sql_verify = load_sql_query('select_program_by_id.sql')
-        cur.execute(sql_verify, (program_id,))
-        program = cur.fetchone()
-        if not program or program['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
-        # Use existing values if not provided
-        name = name if name is not None else program['name']
-        description = description if description is not None else program['description']
-        is_active = is_active if is_active is not None else program['is_active']
-        
+        # Ownership is checked by the UPDATE itself; missing fields keep their values
         sql_query = load_sql_query('update_program.sql')
-        cur.execute(sql_query, (name, description, is_active, program_id))
+        cur.execute(sql_query, (name, description, is_active, program_id, user_id))
         
         updated_program = cur.fetchone()
+        if not updated_program:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
         conn.commit()
         cur.close()
         conn.close()
@@ -164,21 +161,19 @@ def update_program(user_id, program_id):
 @token_required
 def delete_program(user_id, program_id):
     """Delete a workout program."""
+    conn = None
+    cur = None
     try:
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this program
-        sql_verify = load_sql_query('select_program_by_id.sql')
-        cur.execute(sql_verify, (program_id,))
-        program = cur.fetchone()
-        if not program or program['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
+        # Only deletes if the user owns this program
         sql_query = load_sql_query('delete_program.sql')
-        cur.execute(sql_query, (program_id,))
+        cur.execute(sql_query, (program_id, user_id))
         
         deleted_program = cur.fetchone()
+        if not deleted_program:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
         conn.commit()
         cur.close()
         conn.close()
@@ -205,8 +200,7 @@ def get_templates(user_id, program_id):
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # Verify user owns this program
-        sql_verify = load_sql_query('select_program_by_id.sql')
-        cur.execute(sql_verify, (program_id,))
+        execute_query(cur, 'select_program_by_id.sql', (program_id,))
         program = cur.fetchone()
         if not program or program['user_id'] != user_id:
             return jsonify({"success": False, "error": "Unauthorized"}), 403
@@ -223,6 +217,29 @@ def get_templates(user_id, program_id):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+# GET a program with all its templates and their exercises
+@workouts_bp.route('/programs/<int:program_id>/tree', methods=['GET'])
+@token_required
+def get_program_tree(user_id, program_id):
+    """Get a program, its templates and each template's exercises in one query."""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # Ownership is part of the WHERE clause, so no separate verify query
+        execute_query(cur, 'select_program_tree.sql', (program_id, user_id))
+        program = cur.fetchone()
+        cur.close()
+        conn.close()
+        
+        if not program:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
+        
+        return jsonify({"success": True, "program": convert_dict_dates_to_iso8601(dict(program))}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 # CREATE a new workout template
 @workouts_bp.route('/programs/<int:program_id>/templates', methods=['POST'])
 @token_required
@@ -240,17 +257,13 @@ def create_template(user_id, program_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this program
-        sql_verify = load_sql_query('select_program_by_id.sql')
-        cur.execute(sql_verify, (program_id,))
-        program = cur.fetchone()
-        if not program or program['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
+        # Only inserts if the user owns this program
         sql_query = load_sql_query('insert_workout_template.sql')
-        cur.execute(sql_query, (program_id, name, day_order, notes))
+        cur.execute(sql_query, (name, day_order, notes, program_id, user_id))
         
         template = cur.fetchone()
+        if not template:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
         conn.commit()
         cur.close()
         conn.close()
@@ -277,26 +290,14 @@ def update_template(user_id, template_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this template via program ownership check
-        sql_verify = load_sql_query('verify_template_owner_by_id.sql')
-        cur.execute(sql_verify, (template_id,))
-        result = cur.fetchone()
-        if not result or result['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
-        # Get current template to use existing values if not provided
-        sql_get = load_sql_query('select_template_by_id.sql')
-        cur.execute(sql_get, (template_id,))
-        template = cur.fetchone()
-        
-        name = name if name is not None else template['name']
-        notes = notes if notes is not None else template['notes']
-        day_order = day_order if day_order is not None else template['day_order']
-        
+        # Ownership (through the program) is checked by the UPDATE itself;
+        # missing fields keep their values
         sql_query = load_sql_query('update_workout_template.sql')
-        cur.execute(sql_query, (name, notes, day_order, template_id))
+        cur.execute(sql_query, (name, notes, day_order, template_id, user_id))
         
         updated_template = cur.fetchone()
+        if not updated_template:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
         conn.commit()
         cur.close()
         conn.close()
@@ -311,22 +312,19 @@ def update_template(user_id, template_id):
 @token_required
 def delete_template(user_id, template_id):
     """Delete a workout template."""
+    conn = None
+    cur = None
     try:
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this template via program ownership check
-        sql_verify = load_sql_query('verify_template_owner_by_id.sql')
-        cur.execute(sql_verify, (template_id,))
-        result = cur.fetchone()
-        if not result or result['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
-        # Delete the template (cascading delete will remove template_exercises)
+        # Delete the template if the user owns its program (cascading delete will remove template_exercises)
         sql_query = load_sql_query('delete_workout_template.sql')
-        cur.execute(sql_query, (template_id,))
+        cur.execute(sql_query, (template_id, user_id))
         
         deleted = cur.fetchone()
+        if not deleted:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
         conn.commit()
         cur.close()
         conn.close()
@@ -353,14 +351,12 @@ def get_template_exercises(user_id, template_id):
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # Verify user owns this template via program ownership check
-        sql_verify = load_sql_query('verify_template_owner_by_id.sql')
-        cur.execute(sql_verify, (template_id,))
+        execute_query(cur, 'verify_template_owner_by_id.sql', (template_id,))
         result = cur.fetchone()
         if not result or result['user_id'] != user_id:
             return jsonify({"success": False, "error": "Unauthorized"}), 403
         
-        sql_query = load_sql_query('select_template_exercises.sql')
-        cur.execute(sql_query, (template_id,))
+        execute_query(cur, 'select_template_exercises.sql', (template_id,))
         
         exercises = cur.fetchall()
         cur.close()
@@ -391,17 +387,13 @@ def add_template_exercise(user_id, template_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this template
-        sql_verify = load_sql_query('verify_template_owner_by_id.sql')
-        cur.execute(sql_verify, (template_id,))
-        result = cur.fetchone()
-        if not result or result['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
+        # Only inserts if the user owns this template
         sql_query = load_sql_query('insert_template_exercise.sql')
-        cur.execute(sql_query, (template_id, exercise_id, target_sets, target_reps, target_weight_lb, rest_seconds, order_index))
+        cur.execute(sql_query, (exercise_id, target_sets, target_reps, target_weight_lb, rest_seconds, order_index, template_id, user_id))
         
         template_exercise = cur.fetchone()
+        if not template_exercise:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
         conn.commit()
         cur.close()
         conn.close()
@@ -416,31 +408,19 @@ def add_template_exercise(user_id, template_id):
 @token_required
 def remove_template_exercise(user_id, template_id, template_exercise_id):
     """Remove an exercise from a workout template."""
+    conn = None
+    cur = None
     try:
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this template
-        sql_verify = load_sql_query('verify_template_owner_by_id.sql')
-        cur.execute(sql_verify, (template_id,))
-        result = cur.fetchone()
-        if not result or result['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
-        # Verify the template exercise belongs to this template
-        cur.execute("""
-            SELECT id FROM template_exercises 
-            WHERE id = %s AND template_id = %s
-        """, (template_exercise_id, template_id))
-        
-        if not cur.fetchone():
-            return jsonify({"success": False, "error": "Template exercise not found"}), 404
-        
-        # Delete the template exercise
+        # Delete the template exercise if it belongs to this template and the user owns it
         sql_query = load_sql_query('delete_template_exercise.sql')
-        cur.execute(sql_query, (template_exercise_id,))
+        cur.execute(sql_query, (template_exercise_id, template_id, user_id))
         
         deleted = cur.fetchone()
+        if not deleted:
+            return jsonify({"success": False, "error": "Template exercise not found"}), 404
         conn.commit()
         cur.close()
         conn.close()
@@ -464,6 +444,8 @@ def remove_template_exercise(user_id, template_id, template_exercise_id):
 @token_required
 def create_session(user_id):
     """Start a new workout session from a template."""
+    conn = None
+    cur = None
     try:
         data = request.get_json()
         template_id = data.get('template_id')
@@ -474,35 +456,23 @@ def create_session(user_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify template exists and user has access
-        sql_verify = load_sql_query('verify_template_owner_by_id.sql')
-        cur.execute(sql_verify, (template_id,))
-        result = cur.fetchone()
-        if not result or result['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
-        # Create the session
+        # Create the session if the template exists and user has access
         sql_query = load_sql_query('insert_workout_session.sql')
-        cur.execute(sql_query, (user_id, template_id, ''))
+        cur.execute(sql_query, ('', template_id, user_id))
         session = cur.fetchone()
+        if not session:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
         session_id = session['id']
         
-        # Pre-fill sets from template
-        sql_get_exercises = load_sql_query('select_template_exercises.sql')
-        cur.execute(sql_get_exercises, (template_id,))
-        
-        template_exercises = cur.fetchall()
-        
-        for te in template_exercises:
-            for set_num in range(1, te['target_sets'] + 1):
-                cur.execute("""
-                    INSERT INTO workout_sets (session_id, exercise_id, set_number)
-                    VALUES (%s, %s, %s)
-                """, (session_id, te['exercise_id'], set_num))
+        # Pre-fill one empty set per target set of every template exercise, in a single statement
+        sql_prefill = load_sql_query('insert_prefill_sets_from_template.sql')
+        cur.execute(sql_prefill, (session_id, template_id))
+        sets = cur.fetchall()
         
         conn.commit()
+        invalidate_user_context(user_id)
         
-        return jsonify({"success": True, "session": convert_dict_dates_to_iso8601(dict(session))}), 201
+        return jsonify({"success": True, "session": convert_dict_dates_to_iso8601(dict(session)), "sets": convert_dict_dates_to_iso8601(sets)}), 201
     except Exception as e:
         if conn:
             conn.rollback()
@@ -524,15 +494,13 @@ def get_session(user_id, session_id):
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # Get session and verify ownership
-        sql_query = load_sql_query('select_workout_session.sql')
-        cur.execute(sql_query, (session_id, user_id))
+        execute_query(cur, 'select_workout_session.sql', (session_id, user_id))
         session = cur.fetchone()
         if not session:
             return jsonify({"success": False, "error": "Session not found"}), 404
         
         # Get all sets for this session
-        sql_sets = load_sql_query('select_workout_sets.sql')
-        cur.execute(sql_sets, (session_id,))
+        execute_query(cur, 'select_workout_sets.sql', (session_id,))
         sets = cur.fetchall()
         cur.close()
         conn.close()
@@ -553,8 +521,7 @@ def get_sessions(user_id):
         
         limit = request.args.get('limit', 20, type=int)
         
-        sql_query = load_sql_query('select_user_sessions.sql')
-        cur.execute(sql_query, (user_id, limit))
+        execute_query(cur, 'select_user_sessions.sql', (user_id, limit))
         
         sessions = cur.fetchall()
         cur.close()
@@ -572,6 +539,8 @@ def get_sessions(user_id):
 @token_required
 def log_set(user_id, session_id):
     """Log a new set during a workout."""
+    conn = None
+    cur = None
     try:
         data = request.get_json()
         exercise_id = data.get('exercise_id')
@@ -584,23 +553,147 @@ def log_set(user_id, session_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this session
-        sql_verify = load_sql_query('select_session_owner.sql')
-        cur.execute(sql_verify, (session_id,))
-        session = cur.fetchone()
-        if not session or session['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
-        # Insert the set
-        sql_query = load_sql_query('insert_workout_set.sql')
-        cur.execute(sql_query, (session_id, exercise_id, set_number, reps_completed, weight_lb, rpe, is_warmup))
+        # Insert the set if the user owns this session
+        execute_query(cur, 'insert_workout_set.sql', (exercise_id, set_number, reps_completed, weight_lb, rpe, is_warmup, session_id, user_id))
         
         new_set = cur.fetchone()
+        if not new_set:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
+        new_records = record_sets(cur, user_id, [new_set])
+        refresh_session_rollups(cur, user_id, [session_id])
         conn.commit()
+        invalidate_user_context(user_id)
+        
+        apply_workout_progress(conn, user_id, [set_change(new_set)], new_records=len(new_records))
         cur.close()
         conn.close()
         
-        return jsonify({"success": True, "set": convert_dict_dates_to_iso8601(dict(new_set))}), 201
+        return jsonify({
+            "success": True,
+            "set": convert_dict_dates_to_iso8601(dict(new_set)),
+            "new_records": new_records
+        }), 201
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+# LOG several sets at once (queued offline by the client)
+MAX_BATCH_SETS = 100
+
+@workouts_bp.route('/sessions/<int:session_id>/sets/batch', methods=['POST'])
+@token_required
+def log_sets_batch(user_id, session_id):
+    """Insert new sets and update logged ones (items with an 'id') in one transaction."""
+    conn = None
+    cur = None
+    try:
+        data = request.get_json()
+        items = data.get('sets')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({"success": False, "error": "sets must be a non-empty list"}), 400
+        if len(items) > MAX_BATCH_SETS:
+            return jsonify({"success": False, "error": f"At most {MAX_BATCH_SETS} sets per batch"}), 400
+        
+        results = [None] * len(items)
+        inserts = []
+        updates = []
+        changes = []
+        logged_sets = []
+        edited_sets = []
+        update_ids = set()
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {"index": index, "success": False, "error": "Set must be an object"}
+            elif item.get('id') is not None:
+                try:
+                    if isinstance(item['id'], bool):
+                        raise ValueError
+                    set_id = int(item['id'])
+                except (TypeError, ValueError):
+                    return jsonify({"success": False, "error": f"sets[{index}].id must be an integer"}), 400
+                if set_id in update_ids:
+                    return jsonify({"success": False, "error": f"Set {set_id} appears more than once"}), 400
+                update_ids.add(set_id)
+                updates.append((index, set_id, item))
+            elif not item.get('exercise_id'):
+                results[index] = {"index": index, "success": False, "error": "exercise_id is required"}
+            else:
+                inserts.append((index, item))
+        
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # Verify user owns this session (once for the whole batch)
+        execute_query(cur, 'select_session_owner.sql', (session_id,))
+        session = cur.fetchone()
+        if not session or session['user_id'] != user_id:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
+        
+        if inserts:
+            sql_insert = load_sql_query('insert_workout_sets_batch.sql')
+            cur.execute(sql_insert, (
+                [item.get('exercise_id') for _, item in inserts],
+                [item.get('set_number') for _, item in inserts],
+                [item.get('reps_completed') for _, item in inserts],
+                [item.get('weight_lb') for _, item in inserts],
+                [item.get('rpe') for _, item in inserts],
+                [item.get('is_warmup', False) for _, item in inserts],
+                session_id
+            ))
+            # ord is the 1-based position in `inserts`
+            for row in cur.fetchall():
+                new_set = dict(row)
+                index = inserts[new_set.pop('ord') - 1][0]
+                results[index] = {"index": index, "success": True, "action": "insert", "set": new_set}
+                changes.append(set_change(new_set))
+                logged_sets.append(new_set)
+        
+        if updates:
+            sql_update = load_sql_query('update_workout_sets_batch.sql')
+            cur.execute(sql_update, (
+                [set_id for _, set_id, _ in updates],
+                [item.get('reps_completed') for _, _, item in updates],
+                [item.get('weight_lb') for _, _, item in updates],
+                [item.get('rpe') for _, _, item in updates],
+                session_id
+            ))
+            updated = {}
+            for row in cur.fetchall():
+                updated_set = dict(row)
+                previous = {
+                    'reps_completed': updated_set.pop('previous_reps_completed'),
+                    'weight_lb': updated_set.pop('previous_weight_lb')
+                }
+                updated[updated_set['id']] = updated_set
+                changes.append(set_change(updated_set, previous))
+                edited_sets.append((updated_set, previous))
+            for index, set_id, _ in updates:
+                if set_id in updated:
+                    results[index] = {"index": index, "success": True, "action": "update", "set": updated[set_id]}
+                else:
+                    results[index] = {"index": index, "success": False, "error": "Set not found in this session"}
+        
+        new_records = record_sets(cur, user_id, logged_sets, edited_sets)
+        if logged_sets or edited_sets:
+            refresh_session_rollups(cur, user_id, [session_id])
+        conn.commit()
+        invalidate_user_context(user_id)
+        
+        apply_workout_progress(conn, user_id, changes, new_records=len(new_records))
+        
+        return jsonify({
+            "success": True,
+            "results": convert_dict_dates_to_iso8601(results),
+            "new_records": new_records
+        }), 200
     except Exception as e:
         if conn:
             conn.rollback()
@@ -617,6 +710,8 @@ def log_set(user_id, session_id):
 @token_required
 def update_set(user_id, set_id):
     """Update a logged set."""
+    conn = None
+    cur = None
     try:
         data = request.get_json()
         reps_completed = data.get('reps_completed')
@@ -626,23 +721,32 @@ def update_set(user_id, set_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this set (through session)
-        sql_verify = load_sql_query('verify_set_owner.sql')
-        cur.execute(sql_verify, (set_id, user_id))
+        # Update the set if the user owns it (through session)
+        execute_query(cur, 'update_workout_set.sql', (reps_completed, weight_lb, rpe, set_id, user_id))
         
-        if not cur.fetchone():
+        updated_set = cur.fetchone()
+        if not updated_set:
             return jsonify({"success": False, "error": "Unauthorized"}), 403
         
-        # Update the set
-        sql_query = load_sql_query('update_workout_set.sql')
-        cur.execute(sql_query, (reps_completed, weight_lb, rpe, set_id))
-        
-        updated_set = cur.fetchone()
+        updated_set = dict(updated_set)
+        previous = {
+            'reps_completed': updated_set.pop('previous_reps_completed'),
+            'weight_lb': updated_set.pop('previous_weight_lb')
+        }
+        new_records = record_sets(cur, user_id, edited_sets=[(updated_set, previous)])
+        refresh_session_rollups(cur, user_id, [updated_set['session_id']])
         conn.commit()
+        invalidate_user_context(user_id)
+        
+        apply_workout_progress(conn, user_id, [set_change(updated_set, previous)], new_records=len(new_records))
         cur.close()
         conn.close()
         
-        return jsonify({"success": True, "set": convert_dict_dates_to_iso8601(dict(updated_set))}), 200
+        return jsonify({
+            "success": True,
+            "set": convert_dict_dates_to_iso8601(dict(updated_set)),
+            "new_records": new_records
+        }), 200
     except Exception as e:
         if conn:
             conn.rollback()
@@ -661,6 +765,8 @@ def update_set(user_id, set_id):
 @token_required
 def complete_session(user_id, session_id):
     """Complete a workout session and calculate stats."""
+    conn = None
+    cur = None
     try:
         data = request.get_json()
         notes = data.get('notes', '')
@@ -668,47 +774,36 @@ def complete_session(user_id, session_id):
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Verify user owns this session
-        sql_verify = load_sql_query('select_session_owner.sql')
-        cur.execute(sql_verify, (session_id,))
-        session = cur.fetchone()
-        if not session or session['user_id'] != user_id:
-            return jsonify({"success": False, "error": "Unauthorized"}), 403
-        
-        # Calculate total volume and duration
-        sql_stats = load_sql_query('select_session_stats.sql')
-        cur.execute(sql_stats, (session_id,))
-        stats = cur.fetchone()
-        total_volume = float(stats['total_volume_lb']) if stats['total_volume_lb'] else 0
-        
-        # Get start time and calculate duration
-        sql_get_time = load_sql_query('select_session_start_time.sql')
-        cur.execute(sql_get_time, (session_id,))
-        session_data = cur.fetchone()
-        start_time = session_data['start_time']
-        end_time = datetime.datetime.now(datetime.timezone.utc)
-        duration_min = int((end_time - start_time).total_seconds() / 60)
-        
-        # Estimate calories (rough formula: 5 calories per 1000 lbs volume + 3 per minute)
-        calories_burned = int((total_volume / 1000 * 5) + (duration_min * 3))
-        
-        # Update session
-        sql_update = load_sql_query('update_workout_session_complete.sql')
-        cur.execute(sql_update, (end_time, duration_min, total_volume, calories_burned, notes, session_id))
-        
+        # Ownership check, stats and update in one statement. Calories are
+        # estimated in SQL (5 per 1000 lbs volume + 3 per minute). Retrying an
+        # already completed session returns it unchanged.
+        sql_complete = load_sql_query('complete_workout_session.sql')
+        cur.execute(sql_complete, (session_id, user_id, notes))
+
         completed_session = cur.fetchone()
+        if not completed_session:
+            return jsonify({"success": False, "error": "Unauthorized"}), 403
+        if completed_session['just_completed']:
+            record_activity(cur, user_id, workouts=1, calories=completed_session['calories_burned'])
+            record_session_rollups(cur, user_id, session_id)
         conn.commit()
-        cur.close()
-        conn.close()
-        
+        invalidate_user_context(user_id)
+
+        completed_session = dict(completed_session)
+        just_completed = completed_session.pop('just_completed')
+        if just_completed:
+            apply_workout_progress(conn, user_id, sessions_completed=1)
+        total_volume = float(completed_session['total_volume_lb'] or 0)
+
         return jsonify({
-            "success": True, 
-            "session": convert_dict_dates_to_iso8601(dict(completed_session)),
+            "success": True,
+            "session": convert_dict_dates_to_iso8601(completed_session),
             "stats": {
                 "total_volume_lb": total_volume,
-                "calories_burned": calories_burned,
-                "duration_min": duration_min
-            }
+                "calories_burned": completed_session['calories_burned'],
+                "duration_min": completed_session['duration_min']
+            },
+            "already_completed": not just_completed
         }), 200
     except Exception as e:
         if conn:
@@ -719,3 +814,64 @@ def complete_session(user_id, session_id):
             cur.close()
         if conn:
             conn.close()
+
+
+# ===================== Personal Records =====================
+
+_RECORD_WEIGHTS = ('best_weight_lb', 'best_e1rm_lb', 'best_e1rm_weight_lb', 'first_e1rm_lb', 'last_e1rm_lb', 'progress_percent')
+
+
+def _record_row(row):
+    row = dict(row)
+    for key in _RECORD_WEIGHTS:
+        # progress_percent is NULL when the first e1RM rounds to 0
+        row[key] = float(row[key]) if row[key] is not None else None
+    return row
+
+
+# QUERY personal records
+@workouts_bp.route('/records', methods=['GET'])
+@token_required
+def get_personal_records(user_id):
+    """Best weight, best estimated 1RM and progress for every exercise the user has logged."""
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        records = [_record_row(row) for row in get_records(cur, user_id)]
+
+        return jsonify({"success": True, "records": convert_dict_dates_to_iso8601(records)}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+# QUERY the personal record for one exercise
+@workouts_bp.route('/records/<int:exercise_id>', methods=['GET'])
+@token_required
+def get_personal_record(user_id, exercise_id):
+    """Personal record for one exercise."""
+    conn = None
+    cur = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        records = get_records(cur, user_id, exercise_id)
+        if not records:
+            return jsonify({"success": False, "error": "No record for this exercise"}), 404
+
+        return jsonify({"success": True, "record": convert_dict_dates_to_iso8601(_record_row(records[0]))}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
@@ -7,6 +7,11 @@ from api.challenges import challenge_bp
 from api.users import users_bp
 from api.ai import ai_bp
 from api.workouts import workouts_bp
+from api.leaderboard import leaderboard_bp
+from api.analytics import analytics_bp
+from utils.db_pool import init_db_pool
+from utils.sql_loader import init_sql_registry
+from cli import register_commands
 
 def create_app():
     load_dotenv()
@@ -22,12 +27,22 @@ def create_app():
     app.config['ENV'] = os.getenv('FLASK_ENV', 'production')
     app.config['DEBUG'] = os.getenv('FLASK_DEBUG', 'False').lower() in ('true', '1', 't')
 
+    # read every .sql file once; a missing or duplicate query stops the boot
+    init_sql_registry(app)
+
+    # one pooled connection per request, returned at teardown
+    init_db_pool(app)
+
     # blueprint registry
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(challenge_bp, url_prefix='/api/challenges')
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(ai_bp, url_prefix='/api/ai')
     app.register_blueprint(workouts_bp, url_prefix='/api/workouts')
+    app.register_blueprint(leaderboard_bp, url_prefix='/api/leaderboard')
+    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+
+    register_commands(app)
 
     # test routes
     @app.route('/')
@@ -0,0 +1,61 @@
+# Maintenance commands, run with: flask --app app <command>
+
+import click
+from services.exercise_catalog import refresh_catalog, SNAPSHOT_PATH
+from services.challenge_service import pregenerate_challenges
+from services.leaderboard_service import refresh_ranks, reset_broken_streaks
+from services.analytics_service import backfill_training_rollups
+from services.exercise_records import backfill_exercise_records
+from utils.db_pool import pooled_connection
+
+
+def register_commands(app):
+
+    @app.cli.command('refresh-exercise-catalog')
+    def refresh_exercise_catalog():
+        """Download free-exercise-db and rewrite data/exercises.json."""
+        info = refresh_catalog()
+        click.echo(f"Saved {info['count']} exercises to {SNAPSHOT_PATH} (sha256 {info['sha256'][:12]})")
+
+    @app.cli.command('pregenerate-challenges')
+    @click.option('--ahead-hours', default=6, show_default=True,
+                  help='Also create challenges for a period starting within this many hours.')
+    @click.option('--chunk-size', default=500, show_default=True, help='Users per transaction.')
+    @click.option('--active-days', default=30, show_default=True,
+                  help='Only users with challenge or workout activity in this many days.')
+    def pregenerate_challenges_command(ahead_hours, chunk_size, active_days):
+        """Create the current and upcoming Daily/Weekly challenges ahead of the boundary."""
+        with pooled_connection() as conn:
+            stats = pregenerate_challenges(conn, ahead_hours, chunk_size, active_days)
+        click.echo(f"Checked {stats['users']} users: {stats['inserted']} challenges created, "
+                   f"{stats['deleted']} expired removed")
+
+    @app.cli.command('refresh-leaderboard-ranks')
+    def refresh_leaderboard_ranks():
+        """Recompute the materialized leaderboard rank column."""
+        with pooled_connection() as conn:
+            updated = refresh_ranks(conn)
+        click.echo(f"Updated rank for {updated} leaderboard entries")
+
+    @app.cli.command('reset-broken-streaks')
+    def reset_broken_streaks_command():
+        """Zero the current streak of users who missed a day."""
+        with pooled_connection() as conn:
+            updated = reset_broken_streaks(conn)
+        click.echo(f"Reset {updated} broken streaks")
+
+    @app.cli.command('backfill-training-rollups')
+    @click.option('--chunk-size', default=200, show_default=True, help='Users per transaction.')
+    def backfill_training_rollups_command(chunk_size):
+        """Rebuild the daily/weekly training rollups from completed sessions."""
+        with pooled_connection() as conn:
+            stats = backfill_training_rollups(conn, chunk_size)
+        click.echo(f"Rebuilt rollups for {stats['users']} users: {stats['days']} days, {stats['weeks']} weeks")
+
+    @app.cli.command('backfill-exercise-records')
+    @click.option('--chunk-size', default=200, show_default=True, help='Users per transaction.')
+    def backfill_exercise_records_command(chunk_size):
+        """Rebuild personal records and estimated 1RMs from logged sets."""
+        with pooled_connection() as conn:
+            stats = backfill_exercise_records(conn, chunk_size)
+        click.echo(f"Rebuilt {stats['records']} exercise records for {stats['users']} users")
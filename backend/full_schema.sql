@@ -20,6 +20,7 @@ create table public.profiles (
   main_focus character varying(50) null,
   goal_weight_lb numeric null,
   activity_intensity character varying(50) null,
+  timezone character varying(64) not null default 'UTC'::character varying,
   constraint profiles_pkey primary key (user_id),
   constraint profiles_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE
 ) TABLESPACE pg_default;
@@ -86,13 +87,16 @@ create table public.challenges (
   is_completed boolean not null default false,
   assigned_at timestamp without time zone not null default CURRENT_TIMESTAMP,
   last_updated timestamp without time zone null default CURRENT_TIMESTAMP,
+  period_key character varying(16) not null default ''::character varying,
   constraint challenges_pkey primary key (id),
   constraint fk_challenge_user foreign KEY (user_id) references users (id) on delete CASCADE
 ) TABLESPACE pg_default;
 
+create index IF not exists idx_challenges_user_type_period on public.challenges using btree (user_id, challenge_type, period_key) TABLESPACE pg_default;
+
 create table public.leaderboard (
   user_id integer not null,
-  total_points integer null default 0,
+  total_points integer not null default 0,
   workouts_completed integer null default 0,
   challenges_completed integer null default 0,
   current_streak_days integer null default 0,
@@ -100,6 +104,77 @@ create table public.leaderboard (
   total_calories_burned integer null default 0,
   rank integer null,
   last_updated timestamp without time zone null default now(),
+  last_active_date date null,
   constraint leaderboard_pkey primary key (user_id),
   constraint leaderboard_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE
-) TABLESPACE pg_default;
\ No newline at end of file
+) TABLESPACE pg_default;
+
+create index IF not exists idx_leaderboard_points on public.leaderboard using btree (total_points, user_id) TABLESPACE pg_default;
+
+create index IF not exists idx_leaderboard_active_streaks on public.leaderboard using btree (last_active_date) TABLESPACE pg_default
+where
+  (current_streak_days > 0);
+create table public.user_daily_training (
+  user_id integer not null,
+  day date not null,
+  sessions integer not null default 0,
+  sets integer not null default 0,
+  reps integer not null default 0,
+  volume_lb numeric not null default 0,
+  duration_min integer not null default 0,
+  calories_burned integer not null default 0,
+  volume_by_category jsonb not null default '{}'::jsonb,
+  constraint user_daily_training_pkey primary key (user_id, day),
+  constraint user_daily_training_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE
+) TABLESPACE pg_default;
+
+create table public.user_weekly_training (
+  user_id integer not null,
+  week_start date not null,
+  sessions integer not null default 0,
+  sets integer not null default 0,
+  reps integer not null default 0,
+  volume_lb numeric not null default 0,
+  duration_min integer not null default 0,
+  calories_burned integer not null default 0,
+  volume_by_category jsonb not null default '{}'::jsonb,
+  constraint user_weekly_training_pkey primary key (user_id, week_start),
+  constraint user_weekly_training_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE
+) TABLESPACE pg_default;
+
+create table public.user_exercise_records (
+  user_id integer not null,
+  exercise_id integer not null,
+  best_weight_lb numeric not null,
+  best_weight_reps integer not null,
+  best_e1rm_lb numeric not null,
+  best_e1rm_weight_lb numeric not null,
+  best_e1rm_reps integer not null,
+  best_e1rm_session_id integer not null,
+  first_e1rm_lb numeric not null,
+  first_session_id integer not null,
+  last_e1rm_lb numeric not null,
+  last_session_id integer not null,
+  set_count integer not null default 0,
+  updated_at timestamp with time zone not null default now(),
+  constraint user_exercise_records_pkey primary key (user_id, exercise_id),
+  constraint user_exercise_records_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE,
+  constraint user_exercise_records_exercise_id_fkey foreign KEY (exercise_id) references exercises (id) on delete CASCADE
+) TABLESPACE pg_default;
+
+create table public.ai_conversation_threads (
+  id serial not null,
+  user_id integer not null,
+  title character varying(255) not null default ''::character varying,
+  summary text not null default ''::text,
+  summarized_through_id integer null,
+  turn_count integer not null default 0,
+  created_at timestamp with time zone not null default now(),
+  updated_at timestamp with time zone not null default now(),
+  constraint ai_conversation_threads_pkey primary key (id),
+  constraint ai_conversation_threads_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE
+) TABLESPACE pg_default;
+
+create index IF not exists idx_ai_conversation_threads_user_id on public.ai_conversation_threads using btree (user_id, id) TABLESPACE pg_default;
+
+create index IF not exists idx_ai_conversation_threads_user_updated on public.ai_conversation_threads using btree (user_id, updated_at) TABLESPACE pg_default;
@@ -0,0 +1,16 @@
+-- Challenges are rotated by a stored period key instead of date math on assigned_at.
+-- Daily: 'YYYY-MM-DD', Weekly: ISO week 'IYYY-Www', All-Time: 'all-time' (all UTC).
+
+alter table public.challenges
+  add column if not exists period_key character varying(16) not null default ''::character varying;
+
+update public.challenges
+set period_key = case challenge_type
+    when 'Daily' then to_char(assigned_at, 'YYYY-MM-DD')
+    when 'Weekly' then to_char(assigned_at, 'IYYY-"W"IW')
+    else 'all-time'
+  end
+where period_key = '';
+
+create index if not exists idx_challenges_user_type_period
+  on public.challenges using btree (user_id, challenge_type, period_key) TABLESPACE pg_default;
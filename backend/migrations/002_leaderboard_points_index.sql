@@ -0,0 +1,9 @@
+-- Leaderboard pages and neighbour lookups walk this index instead of sorting the table.
+
+update public.leaderboard set total_points = 0 where total_points is null;
+
+alter table public.leaderboard
+  alter column total_points set not null;
+
+create index if not exists idx_leaderboard_points
+  on public.leaderboard using btree (total_points, user_id) TABLESPACE pg_default;
@@ -0,0 +1,11 @@
+-- Streaks are kept on the leaderboard row and counted in the user's local days.
+
+alter table public.profiles
+  add column if not exists timezone character varying(64) not null default 'UTC'::character varying;
+
+alter table public.leaderboard
+  add column if not exists last_active_date date null;
+
+create index if not exists idx_leaderboard_active_streaks
+  on public.leaderboard using btree (last_active_date) TABLESPACE pg_default
+  where current_streak_days > 0;
@@ -0,0 +1,30 @@
+-- Per-user training rollups, one row per local day and per ISO week (week_start is the Monday).
+-- Filled as sessions complete; existing history is loaded with: flask --app app backfill-training-rollups
+
+create table if not exists public.user_daily_training (
+  user_id integer not null,
+  day date not null,
+  sessions integer not null default 0,
+  sets integer not null default 0,
+  reps integer not null default 0,
+  volume_lb numeric not null default 0,
+  duration_min integer not null default 0,
+  calories_burned integer not null default 0,
+  volume_by_category jsonb not null default '{}'::jsonb,
+  constraint user_daily_training_pkey primary key (user_id, day),
+  constraint user_daily_training_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE
+) TABLESPACE pg_default;
+
+create table if not exists public.user_weekly_training (
+  user_id integer not null,
+  week_start date not null,
+  sessions integer not null default 0,
+  sets integer not null default 0,
+  reps integer not null default 0,
+  volume_lb numeric not null default 0,
+  duration_min integer not null default 0,
+  calories_burned integer not null default 0,
+  volume_by_category jsonb not null default '{}'::jsonb,
+  constraint user_weekly_training_pkey primary key (user_id, week_start),
+  constraint user_weekly_training_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE
+) TABLESPACE pg_default;
@@ -0,0 +1,23 @@
+-- Per-user, per-exercise personal records and estimated 1RM (Epley: weight * (1 + reps / 30)).
+-- first/last hold the best e1RM of the first and latest session with the exercise, for progress %.
+-- Kept current as sets are logged; existing history is loaded with: flask --app app backfill-exercise-records
+
+create table if not exists public.user_exercise_records (
+  user_id integer not null,
+  exercise_id integer not null,
+  best_weight_lb numeric not null,
+  best_weight_reps integer not null,
+  best_e1rm_lb numeric not null,
+  best_e1rm_weight_lb numeric not null,
+  best_e1rm_reps integer not null,
+  best_e1rm_session_id integer not null,
+  first_e1rm_lb numeric not null,
+  first_session_id integer not null,
+  last_e1rm_lb numeric not null,
+  last_session_id integer not null,
+  set_count integer not null default 0,
+  updated_at timestamp with time zone not null default now(),
+  constraint user_exercise_records_pkey primary key (user_id, exercise_id),
+  constraint user_exercise_records_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE,
+  constraint user_exercise_records_exercise_id_fkey foreign KEY (exercise_id) references exercises (id) on delete CASCADE
+) TABLESPACE pg_default;
@@ -0,0 +1,40 @@
+-- Server-side chat memory: each ai_conversations row (one message + reply) belongs to a thread.
+-- The thread keeps a rolling summary of the turns up to summarized_through_id;
+-- prompts use that summary plus the turns after it.
+
+create table if not exists public.ai_conversation_threads (
+  id serial not null,
+  user_id integer not null,
+  title character varying(255) not null default ''::character varying,
+  summary text not null default ''::text,
+  summarized_through_id integer null,
+  turn_count integer not null default 0,
+  created_at timestamp with time zone not null default now(),
+  updated_at timestamp with time zone not null default now(),
+  constraint ai_conversation_threads_pkey primary key (id),
+  constraint ai_conversation_threads_user_id_fkey foreign KEY (user_id) references users (id) on delete CASCADE
+) TABLESPACE pg_default;
+
+create index IF not exists idx_ai_conversation_threads_user_id on public.ai_conversation_threads using btree (user_id, id) TABLESPACE pg_default;
+
+create index IF not exists idx_ai_conversation_threads_user_updated on public.ai_conversation_threads using btree (user_id, updated_at) TABLESPACE pg_default;
+
+alter table public.ai_conversations
+  add column if not exists conversation_id integer null
+  references public.ai_conversation_threads (id) on delete cascade;
+
+create index if not exists idx_ai_conversations_conversation_id
+  on public.ai_conversations using btree (conversation_id, id) TABLESPACE pg_default;
+
+-- existing history becomes one thread per user
+insert into public.ai_conversation_threads (user_id, title, turn_count, created_at, updated_at)
+select user_id, 'Earlier conversation', count(*), min(created_at), max(created_at)
+from public.ai_conversations
+where conversation_id is null
+group by user_id;
+
+update public.ai_conversations c
+set conversation_id = (
+  select min(t.id) from public.ai_conversation_threads t where t.user_id = c.user_id
+)
+where c.conversation_id is null;
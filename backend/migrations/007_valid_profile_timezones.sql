@@ -0,0 +1,7 @@
+-- Timezones were once validated with Python's zoneinfo, which accepts names Postgres
+-- rejects (localtime, posixrules, right/..., posix/...). Streak queries use the stored
+-- name with AT TIME ZONE, so reset any such value to UTC.
+
+update public.profiles
+set timezone = 'UTC'
+where timezone not in (select name from pg_timezone_names);
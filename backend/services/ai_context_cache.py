@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
+
+AI_CONTEXT_CACHE_SIZE = int(os.getenv("AI_CONTEXT_CACHE_SIZE", 2000))
+AI_CONTEXT_CACHE_TTL = int(os.getenv("AI_CONTEXT_CACHE_TTL", 600))
+
+
+class AIContextCache:
+    """Per-user snapshots of the data the AI prompts are built from, plus the
+    rendered context string, with TTL and LRU eviction by user. Writes to a
+    user's sessions, sets or profile drop that user's snapshots and discard any
+    load of theirs still in flight. This state lives in this worker's memory, so a
+    write handled by another gunicorn worker is only picked up once the TTL
+    expires."""
+
+    def __init__(self, max_entries=AI_CONTEXT_CACHE_SIZE, ttl=AI_CONTEXT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # user_id -> {kind: (expires_at, snapshot)}, least recently used user first
+        self._users: "OrderedDict[int, Dict[str, tuple]]" = OrderedDict()
+        self._size = 0
+        self._versions: Dict[int, int] = {}
+        # user_id -> loads in flight; a user's version is dropped with their last one
+        self._loading: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, user_id: int, kind: str, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Returns the cached snapshot for (user_id, kind), or calls loader() and
+        caches its result. A snapshot loaded while the user's version moved is
+        returned but not stored, so a concurrent write is never masked.
+        """
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions.get(user_id, 0)
+            entry = self._users.get(user_id, {}).get(kind)
+            if entry and entry[0] > now:
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            self._loading[user_id] = self._loading.get(user_id, 0) + 1
+
+        snapshot = None
+        try:
+            snapshot = loader()
+        finally:
+            with self._lock:
+                if snapshot is not None and self._versions.get(user_id, 0) == version:
+                    self._store(user_id, kind, snapshot)
+                self._loading[user_id] -= 1
+                if not self._loading[user_id]:
+                    del self._loading[user_id]
+                    self._versions.pop(user_id, None)
+        return snapshot
+
+    def _store(self, user_id: int, kind: str, snapshot: Dict[str, Any]):
+        """Caches a snapshot, evicting least recently used users past max_entries. Caller holds the lock."""
+        entries = self._users.setdefault(user_id, {})
+        self._size += kind not in entries
+        entries[kind] = (time.monotonic() + self.ttl, snapshot)
+        self._users.move_to_end(user_id)
+        while self._size > self.max_entries:
+            _, evicted = self._users.popitem(last=False)
+            self._size -= len(evicted)
+
+    def invalidate(self, user_id: int):
+        """
+        Drops the user's snapshots. The version is only bumped while one of
+        their loads is in flight, so _versions never outgrows the loads running.
+        """
+        with self._lock:
+            self._size -= len(self._users.pop(user_id, {}))
+            if user_id in self._loading:
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': self._size, 'hits': self.hits, 'misses': self.misses}
+
+
+ai_context_cache = AIContextCache()
+
+
+def invalidate_user_context(user_id: Optional[int]):
+    """Call after committing a change to the user's sessions, sets or profile."""
+    if user_id is not None:
+        ai_context_cache.invalidate(user_id)
@@ -0,0 +1,105 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", 2))
+AI_JOB_MAX_QUEUE = int(os.getenv("AI_JOB_MAX_QUEUE", 20))
+AI_JOB_MAX_PER_USER = int(os.getenv("AI_JOB_MAX_PER_USER", 2))
+AI_JOB_RESULT_TTL = int(os.getenv("AI_JOB_RESULT_TTL", 900))
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobLimitReached(Exception):
+    pass
+
+
+class AIJobQueue:
+    """In-process worker pool for slow AI calls. Jobs and results live in this
+    worker's memory, so status has to be polled on the same gunicorn worker."""
+
+    def __init__(self, workers=AI_JOB_WORKERS, max_queue=AI_JOB_MAX_QUEUE,
+                 max_per_user=AI_JOB_MAX_PER_USER, result_ttl=AI_JOB_RESULT_TTL):
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai-job')
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job['finished_at'] and job['finished_at'] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, user_id: int, kind: str, fn: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+        """Queues fn(*args); raises JobQueueFull or JobLimitReached instead of queueing."""
+        with self._lock:
+            self._prune()
+            pending = [job for job in self._jobs.values() if job['status'] in ('queued', 'running')]
+            if len(pending) >= self.max_queue:
+                raise JobQueueFull("AI job queue is full, try again shortly")
+            if sum(1 for job in pending if job['user_id'] == user_id) >= self.max_per_user:
+                raise JobLimitReached("Too many AI jobs in progress for this user")
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'user_id': user_id,
+                'kind': kind,
+                'status': 'queued',
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            self._jobs[job['id']] = job
+
+        self._executor.submit(self._run, job, fn, args)
+        return self._public(job)
+
+    def _run(self, job, fn, args):
+        job['status'] = 'running'
+        job['started_at'] = time.time()
+        try:
+            job['result'] = fn(*args)
+            job['status'] = 'completed' if job['result'].get('success') else 'failed'
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            job['finished_at'] = time.time()
+
+    def get(self, job_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+        if not job or job['user_id'] != user_id:
+            return None
+        return self._public(job)
+
+    def _public(self, job):
+        status = {
+            'job_id': job['id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'queued_seconds': round((job['started_at'] or time.time()) - job['created_at'], 2)
+        }
+        if job['finished_at']:
+            status['result'] = job['result']
+            status['error'] = job['error'] or (job['result'] or {}).get('error')
+        return status
+
+
+ai_job_queue = AIJobQueue()
@@ -1,11 +1,28 @@
 import os
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
-from typing import List, Dict, Any, Optional
-import requests
+from typing import List, Dict, Any, Optional, Iterator, Callable, Tuple
 from datetime import datetime
 import psycopg2
-from utils.sql_loader import load_sql_query
+from psycopg2.extras import RealDictCursor
+from utils.sql_loader import load_sql_query, execute_query
+from utils.db_pool import pooled_connection
+from services.exercise_catalog import exercise_catalog
+from services.prompt_budget import (
+    AI_CHAT_INPUT_TOKENS, AI_WORKOUT_INPUT_TOKENS, AI_ANALYSIS_INPUT_TOKENS, AI_DELOAD_INPUT_TOKENS,
+    AI_CONTEXT_MAX_WORKOUTS, AI_CONTEXT_MAX_LIFTS, AI_SUMMARY_MAX_WORDS,
+    count_tokens, count_message_tokens, clip_text, clean_history, fit_chat_messages, prompt_usage
+)
+
+# Threads shared by every request for fetching AI context queries side by side.
+# Each running query holds its own pooled connection, so this also caps how many
+# connections context fetches can take at once. 1 runs them one after another.
+AI_CONTEXT_FETCH_WORKERS = int(os.getenv("AI_CONTEXT_FETCH_WORKERS", 4))
+_context_executor = ThreadPoolExecutor(
+    max_workers=AI_CONTEXT_FETCH_WORKERS, thread_name_prefix='ai-context'
+) if AI_CONTEXT_FETCH_WORKERS > 1 else None
 SYSTEM_PROMPT = "You are a certified personal trainer AI assistant. You help users create safe, effective workout plans, explain exercises, provide form cues, and answer general fitness or app-related questions. You prioritize safety, avoid unsafe advice, and ask clarifying questions when information is missing. Avoid misinformation and help the user the best you can. When evaluating exercises or weight loads, classify them using one safety label: Safe, Optimal, Caution, or Dangerous. Always explain the reasoning, consider the user’s experience level and context, and suggest safer alternatives when appropriate. Do not encourage unsafe behavior and flag whether to Cautious or something is Dangerous with in detail explanation and provide better alternatives."
 APP_CONTEXT = """
 APP CONTEXT (Journey):
@@ -15,24 +32,127 @@ APP CONTEXT (Journey):
 - The AI focuses on safety, information, and progress
 """
 
+SUMMARY_PROMPT = f"""You summarize coaching conversations accurately and briefly.
+Update the running summary of a conversation between a user and their AI personal trainer with the new exchanges.
+Return only the updated summary, at most {AI_SUMMARY_MAX_WORDS} words. Keep the user's goals, injuries,
+preferences, numbers they gave (weights, reps, dates) and any advice or plans already agreed."""
+
+# JSON replies the calls below ask for, by name
+OUTPUT_FORMATS = """
+OUTPUT FORMATS (reply in one of these only when the request names it; otherwise reply in plain text):
+
+WORKOUT PLAN:
+{
+  "workout_analysis": "Brief analysis of why this workout suits them today",
+  "exercises": [
+    {
+      "exercise_id": "exercise_id_from_database",
+      "name": "Exercise Name",
+      "sets": 3,
+      "reps": "8-12",
+      "weight_recommendation": "specific weight in lbs based on their history",
+      "rest_seconds": 60,
+      "form_cues": ["cue 1", "cue 2"],
+      "reasoning": "why this exercise for this user"
+    }
+  ],
+  "progressive_overload_notes": "How this progresses from last workout",
+  "recovery_recommendations": "Recovery advice"
+}
+
+WORKOUT ANALYSIS:
+{
+  "performance_rating": "excellent/good/moderate/needs_adjustment",
+  "strengths": ["what went well"],
+  "areas_for_improvement": ["what to work on"],
+  "next_session_recommendations": {
+    "exercises_to_increase": ["exercise names"],
+    "focus_areas": ["areas to emphasize"]
+  },
+  "motivation_message": "personalized encouraging message"
+}
+
+DELOAD CHECK:
+{
+  "needs_deload": true/false,
+  "confidence": "high/medium/low",
+  "reasoning": "explanation"
+}
+
+SAFETY ASSESSMENT:
+{
+  "label": "Safe | Optimal | Caution | Dangerous",
+  "reasoning": "Why this label applies based on the user's experience",
+  "recommendation": "What the user should do instead or how to proceed safely",
+  "safer_alternatives": ["alternative 1", "alternative 2"]
+}
+"""
+
+# Every call opens with this exact message, with anything about the user after
+# it, so the provider's prompt cache can reuse the prefix across users and calls.
+# Keep it free of per-request values.
+STATIC_PROMPT = "\n".join([SYSTEM_PROMPT, APP_CONTEXT, OUTPUT_FORMATS])
+
+
+def _static_message() -> Dict[str, str]:
+    return {"role": "system", "content": STATIC_PROMPT}
+
+
+def _log_prompt_usage(call: str, usage: Dict[str, Any]):
+    line = f"AI prompt: call={call} tokens={usage['prompt_tokens']}/{usage['prompt_token_budget']}"
+    if 'history_messages' in usage:
+        line += f" history={usage['history_messages']} dropped={usage['history_messages_dropped']}"
+    print(line)
+
+
+def _record_response_usage(call: str, usage: Dict[str, Any], response_usage: Any,
+                           latency_ms: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Adds the provider's token counts for a finished call to `usage` and logs
+    them. cached_input_tokens were served from the provider's prompt cache,
+    which only applies to prompts of 1024+ tokens.
+    """
+    if response_usage is None:
+        return usage
+    details = getattr(response_usage, 'prompt_tokens_details', None)
+    cached = getattr(details, 'cached_tokens', None) or 0
+    usage.update({
+        'input_tokens': response_usage.prompt_tokens,
+        'cached_input_tokens': cached,
+        'uncached_input_tokens': response_usage.prompt_tokens - cached,
+        'output_tokens': response_usage.completion_tokens
+    })
+    line = (f"AI usage: call={call} input={usage['input_tokens']} cached={cached} "
+            f"uncached={usage['uncached_input_tokens']} output={usage['output_tokens']}")
+    if latency_ms is not None:
+        usage['latency_ms'] = latency_ms
+        line += f" latency_ms={latency_ms}"
+    print(line)
+    return usage
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
 
 class FitnessAIAgent:
     def __init__(self):
         self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
         self.model_id = os.environ.get("FINETUNED_MODEL_ID", "gpt-4o-mini-2024-07-18")
 
-        # Load exercises database
-        self.exercises = self._load_exercises()
+        # Exercise database snapshot, loaded from disk on first use
+        self.catalog = exercise_catalog
 
-    def _load_exercises(self):
-        res = requests.get(
-            "https://raw.githubusercontent.com/yuhonas/free-exercise-db/main/dist/exercises.json",
-            timeout=10
-        )
-        res.raise_for_status()
-        return res.json()
+    @property
+    def exercises(self):
+        return self.catalog.all()
 
-    def _build_user_context(self, user_data: Dict[str, Any]) -> str:
+    def _build_user_context(self, user_data: Dict[str, Any], max_tokens: Optional[int] = None) -> str:
+        """
+        Renders the user's profile, recent workouts and lifts for a prompt. Each
+        section is capped; with max_tokens, the oldest workouts and then the
+        lifts are left out until it fits. Goals and injuries are always kept.
+        """
         context_parts = []
 
         if user_data.get('fitness_level'):
@@ -42,31 +162,44 @@ class FitnessAIAgent:
         if user_data.get('weight'):
             context_parts.append(f"Weight: {user_data['weight']} lbs")
 
-        if user_data.get('workout_history'):
-            history = user_data['workout_history']
-            context_parts.append(f"\nRecent Workout History ({len(history)} workouts):")
-            for workout in history[-5:]:
-                context_parts.append(
-                    f"- {workout.get('start_time')}: {workout.get('exercises_count', 0)} exercises, "
-                    f"{workout.get('duration_min', 0)}min"
-                )
-
-        if user_data.get('strength_progress'):
-            context_parts.append("\nStrength Progress:")
-            for exercise, data in user_data['strength_progress'].items():
-                context_parts.append(
-                    f"- {exercise}: {data.get('current_weight')}lbs x {data.get('current_reps')} reps "
-                    f"(+{data.get('progress_percent')}%)"
-                )
+        # history arrives newest first
+        history = (user_data.get('workout_history') or [])[:AI_CONTEXT_MAX_WORKOUTS]
+        history_lines = [
+            f"- {workout.get('start_time')}: {workout.get('exercises_count', 0)} exercises, "
+            f"{workout.get('duration_min', 0)}min"
+            for workout in history
+        ]
 
+        lifts = list((user_data.get('strength_progress') or {}).items())[:AI_CONTEXT_MAX_LIFTS]
+        lift_lines = [
+            f"- {exercise}: {data.get('current_weight')}lbs x {data.get('current_reps')} reps "
+            f"(est. 1RM {data.get('e1rm')}lbs, {data.get('progress_percent', 0):+}%)"
+            for exercise, data in lifts
+        ]
+
+        closing_parts = []
         if user_data.get('goals'):
-            context_parts.append(f"\nGoals: {', '.join(user_data['goals'])}")
+            closing_parts.append(f"\nGoals: {clip_text(', '.join(user_data['goals']))}")
         if user_data.get('injuries'):
-            context_parts.append(f"Injuries/Limitations: {user_data['injuries']}")
+            closing_parts.append(f"Injuries/Limitations: {clip_text(user_data['injuries'])}")
         if user_data.get('available_equipment'):
-            context_parts.append(f"Available Equipment: {', '.join(user_data['available_equipment'])}")
-
-        return "\n".join(context_parts)
+            closing_parts.append(f"Available Equipment: {clip_text(', '.join(user_data['available_equipment']))}")
+
+        def render():
+            parts = list(context_parts)
+            if history_lines:
+                parts.append(f"\nRecent Workout History ({len(history_lines)} workouts):")
+                parts.extend(history_lines)
+            if lift_lines:
+                parts.append("\nStrength Progress:")
+                parts.extend(lift_lines)
+            return "\n".join(parts + closing_parts)
+
+        rendered = render()
+        while max_tokens is not None and (history_lines or lift_lines) and count_tokens(rendered) > max_tokens:
+            (history_lines or lift_lines).pop()
+            rendered = render()
+        return rendered
 
     def generate_personalized_workout(
             self,
@@ -75,11 +208,8 @@ class FitnessAIAgent:
     ) -> Dict[str, Any]:
         """Generate a truly personalized workout using AI reasoning"""
 
-        user_context = self._build_user_context(user_data)
-
-        prompt = f"""You are an expert personal trainer creating a workout plan.
-
-USER PROFILE & HISTORY:
+        def build_prompt(user_context):
+            return f"""USER PROFILE & HISTORY:
 {user_context}
 
 TODAY'S WORKOUT REQUEST:
@@ -88,41 +218,32 @@ TODAY'S WORKOUT REQUEST:
 - Available Time: {workout_request.get('duration_minutes', 45)} minutes
 - Energy Level: {workout_request.get('energy_level', 'moderate')}
 
-Return a JSON workout plan with this structure:
-{{
-  "workout_analysis": "Brief analysis of why this workout suits them today",
-  "exercises": [
-    {{
-      "exercise_id": "exercise_id_from_database",
-      "name": "Exercise Name",
-      "sets": 3,
-      "reps": "8-12",
-      "weight_recommendation": "specific weight in lbs based on their history",
-      "rest_seconds": 60,
-      "form_cues": ["cue 1", "cue 2"],
-      "reasoning": "why this exercise for this user"
-    }}
-  ],
-  "progressive_overload_notes": "How this progresses from last workout",
-  "recovery_recommendations": "Recovery advice"
-}}"""
+As an expert personal trainer, create today's workout for this user. Return it as JSON in the WORKOUT PLAN format."""
+
+        def build_messages(user_context):
+            return [
+                _static_message(),
+                {
+                    "role": "user",
+                    "content": build_prompt(user_context)
+                }
+            ]
+
+        # whatever the fixed text leaves of the budget goes to the user context
+        context_budget = AI_WORKOUT_INPUT_TOKENS - count_message_tokens(build_messages(''))
+        messages = build_messages(self._build_user_context(user_data, max_tokens=context_budget))
+        usage = prompt_usage(messages, AI_WORKOUT_INPUT_TOKENS)
+        _log_prompt_usage('personalized-workout', usage)
 
         try:
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model=self.model_id,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": SYSTEM_PROMPT
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=messages,
                 temperature=0.7,
                 max_tokens=2500
             )
+            _record_response_usage('personalized-workout', usage, response.usage, _elapsed_ms(started))
 
             content = response.choices[0].message.content.strip()
 
@@ -140,14 +261,11 @@ Return a JSON workout plan with this structure:
             if 'exercises' in workout_plan:
                 enriched = []
                 for exercise in workout_plan['exercises']:
-                    exercise_id = exercise.get('exercise_id')
-                    full_ex = next(
-                        (ex for ex in self.exercises if ex['id'] == exercise_id),
-                        None
-                    )
+                    full_ex = self.catalog.resolve(exercise.get('exercise_id'), exercise.get('name'))
 
                     if full_ex:
                         exercise.update({
+                            'exercise_id': full_ex['id'],
                             'instructions': full_ex.get('instructions', []),
                             'images': full_ex.get('images', []),
                             'primary_muscles': full_ex.get('primaryMuscles', []),
@@ -162,7 +280,8 @@ Return a JSON workout plan with this structure:
                 "success": True,
                 "workout": workout_plan,
                 "generated_at": datetime.now().isoformat(),
-                "model_used": self.model_id
+                "model_used": self.model_id,
+                "usage": usage
             }
 
         except Exception as e:
@@ -180,36 +299,39 @@ Return a JSON workout plan with this structure:
             completed_workout: Dict[str, Any]
     ) -> Dict[str, Any]:
 
-        prompt = f"""Analyze this completed workout:
+        def build_messages(workout_json):
+            return [
+                _static_message(),
+                {"role": "user", "content": build_prompt(workout_json)}
+            ]
 
-USER: {user_data.get('name', 'User')}
+        def build_prompt(workout_json):
+            return f"""USER: {user_data.get('name', 'User')}
 FITNESS LEVEL: {user_data.get('fitness_level', 'intermediate')}
 
 COMPLETED WORKOUT:
-{json.dumps(completed_workout, indent=2)}
+{workout_json}
 
-Provide analysis as JSON:
-{{
-  "performance_rating": "excellent/good/moderate/needs_adjustment",
-  "strengths": ["what went well"],
-  "areas_for_improvement": ["what to work on"],
-  "next_session_recommendations": {{
-    "exercises_to_increase": ["exercise names"],
-    "focus_areas": ["areas to emphasize"]
-  }},
-  "motivation_message": "personalized encouraging message"
-}}"""
+Analyze this completed workout. Return the analysis as JSON in the WORKOUT ANALYSIS format."""
+
+        messages = build_messages(json.dumps(completed_workout, indent=2))
+        if count_message_tokens(messages) > AI_ANALYSIS_INPUT_TOKENS:
+            # the indentation alone is a large share of the tokens
+            messages = build_messages(json.dumps(completed_workout, separators=(',', ':')))
+        usage = prompt_usage(messages, AI_ANALYSIS_INPUT_TOKENS)
+        _log_prompt_usage('analyze-workout', usage)
+        if usage['prompt_tokens'] > AI_ANALYSIS_INPUT_TOKENS:
+            return {"success": False, "error": "Workout is too large to analyze", "usage": usage}
 
         try:
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model=self.model_id,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 temperature=0.6,
                 max_tokens=1000
             )
+            _record_response_usage('analyze-workout', usage, response.usage, _elapsed_ms(started))
 
             content = response.choices[0].message.content.strip()
             if content.startswith("```json"):
@@ -221,7 +343,8 @@ Provide analysis as JSON:
 
             return {
                 "success": True,
-                "analysis": analysis
+                "analysis": analysis,
+                "usage": usage
             }
 
         except Exception as e:
@@ -236,76 +359,136 @@ Provide analysis as JSON:
         msg = message.lower()
         return any(k in msg for k in keywords)
 
-    def chat_with_trainer(
+    def _build_chat_messages(
             self,
             user_data: Dict[str, Any],
             message: str,
-            conversation_history: Optional[List[Dict[str, str]]] = None
-    ) -> Dict[str, Any]:
+            conversation_history: Optional[List[Dict[str, str]]] = None,
+            user_context: Optional[str] = None,
+            conversation_summary: Optional[str] = None
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """
+        Chat prompt trimmed to AI_CHAT_INPUT_TOKENS by dropping the oldest history
+        turns. Ordered from least to most often changing (static prompt, user
+        context, summary, history) so a user's next turn reuses the cached prefix.
+        Returns (messages, usage).
+        """
 
-        user_context = self._build_user_context(user_data)
+        if user_context is None:
+            user_context = self._build_user_context(user_data)
 
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "system", "content": APP_CONTEXT},
+        prefix = [
+            _static_message(),
             {"role": "system", "content": f"USER CONTEXT:\n{user_context}"}
         ]
+        if conversation_summary:
+            prefix.append({"role": "system", "content": f"EARLIER IN THIS CONVERSATION:\n{conversation_summary}"})
 
-        if conversation_history:
-            messages.extend(conversation_history)
         if self.is_safety_question(message):
-            message += """
-
-        Format a response regarding the concern:
-        {
-          "label": "Safe | Optimal | Caution | Dangerous",
-          "reasoning": "Why this label applies based on the user's experience",
-          "recommendation": "What the user should do instead or how to proceed safely",
-          "safer_alternatives": ["alternative 1", "alternative 2"],
-        }
-        """
+            message += "\n\nFormat a response regarding the concern in the SAFETY ASSESSMENT format."
+
+        return fit_chat_messages(
+            prefix, clean_history(conversation_history), {"role": "user", "content": message}, AI_CHAT_INPUT_TOKENS
+        )
+
+    def chat_with_trainer(
+            self,
+            user_data: Dict[str, Any],
+            message: str,
+            conversation_history: Optional[List[Dict[str, str]]] = None,
+            user_context: Optional[str] = None,
+            conversation_summary: Optional[str] = None
+    ) -> Dict[str, Any]:
 
-        messages.append({"role": "user", "content": message})
+        messages, usage = self._build_chat_messages(
+            user_data, message, conversation_history, user_context, conversation_summary
+        )
+        _log_prompt_usage('chat', usage)
 
         try:
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model=self.model_id,
                 messages=messages,
                 temperature=0.7,
                 max_tokens=800
             )
+            _record_response_usage('chat', usage, response.usage, _elapsed_ms(started))
 
             return {
                 "success": True,
-                "response": response.choices[0].message.content
+                "response": response.choices[0].message.content,
+                "usage": usage
             }
 
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    def suggest_deload_week(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+    def stream_chat_with_trainer(
+            self,
+            user_data: Dict[str, Any],
+            message: str,
+            conversation_history: Optional[List[Dict[str, str]]] = None,
+            user_context: Optional[str] = None,
+            conversation_summary: Optional[str] = None,
+            usage: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """Same prompt as chat_with_trainer, yielding text deltas as the model produces them.
+        Pass a dict as `usage` to receive the prompt's token counts, and the
+        provider's (cached and uncached) once the stream is consumed."""
+
+        messages, chat_usage = self._build_chat_messages(
+            user_data, message, conversation_history, user_context, conversation_summary
+        )
+        _log_prompt_usage('chat-stream', chat_usage)
+        if usage is None:
+            usage = {}
+        usage.update(chat_usage)
+
+        stream = self.client.chat.completions.create(
+            model=self.model_id,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=800,
+            stream=True,
+            # the last chunk then carries the token counts, with no choices
+            stream_options={"include_usage": True}
+        )
+
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if getattr(chunk, 'usage', None):
+                _record_response_usage('chat-stream', usage, chunk.usage)
 
-        prompt = f"""Analyze if this user needs a deload week:
+    def suggest_deload_week(self, user_data: Dict[str, Any], user_context: Optional[str] = None) -> Dict[str, Any]:
 
-{self._build_user_context(user_data)}
+        def build_messages(user_context):
+            prompt = f"""USER CONTEXT:
+{user_context}
 
-Return JSON:
-{{
-  "needs_deload": true/false,
-  "confidence": "high/medium/low",
-  "reasoning": "explanation"
-}}"""
+As an expert in recovery management, analyze if this user needs a deload week. Return JSON in the DELOAD CHECK format."""
+            return [
+                _static_message(),
+                {"role": "user", "content": prompt}
+            ]
+
+        context_budget = AI_DELOAD_INPUT_TOKENS - count_message_tokens(build_messages(''))
+        if user_context is None or count_tokens(user_context) > context_budget:
+            user_context = self._build_user_context(user_data, max_tokens=context_budget)
+        messages = build_messages(user_context)
+        usage = prompt_usage(messages, AI_DELOAD_INPUT_TOKENS)
+        _log_prompt_usage('check-deload', usage)
 
         try:
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model=self.model_id,
-                messages=[
-                    {"role": "system", "content": "You are an expert in recovery management."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 temperature=0.6,
                 max_tokens=600
             )
+            _record_response_usage('check-deload', usage, response.usage, _elapsed_ms(started))
 
             content = response.choices[0].message.content.strip()
             if content.startswith("```json"):
@@ -315,40 +498,89 @@ Return JSON:
 
             analysis = json.loads(content.strip())
 
-            return {"success": True, "deload_analysis": analysis}
+            return {"success": True, "deload_analysis": analysis, "usage": usage}
 
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def summarize_conversation(self, summary: str, turns: List[Dict[str, Any]]) -> str:
+        """Folds older chat turns into the running summary kept for the conversation."""
+
+        exchanges = "\n\n".join(
+            f"User: {clip_text(turn['message'], 1000)}\nTrainer: {clip_text(turn['response'], 1000)}"
+            for turn in turns
+        )
+        prompt = f"""CURRENT SUMMARY:
+{summary or '(none yet)'}
+
+NEW EXCHANGES:
+{exchanges}"""
+
+        started = time.perf_counter()
+        response = self.client.chat.completions.create(
+            model=self.model_id,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=AI_SUMMARY_MAX_WORDS * 2
+        )
+        _record_response_usage('summarize', {}, response.usage, _elapsed_ms(started))
+        return response.choices[0].message.content.strip()
+
 
 # ==================== DATABASE HELPER FUNCTIONS ====================
 
+def _run_context_query(query: Callable, user_id: int):
+    with pooled_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            return query(user_id, cur)
+
+
+def fetch_user_context(user_id: int, queries: Dict[str, Callable]) -> Dict[str, Any]:
+    """
+    Runs each query(user_id, cur) on its own pooled connection concurrently, so
+    the total wait is close to the slowest query rather than the sum. Call it
+    without holding a connection of your own.
+    """
+    if _context_executor is None:
+        with pooled_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                return {name: query(user_id, cur) for name, query in queries.items()}
+
+    futures = {name: _context_executor.submit(_run_context_query, query, user_id)
+               for name, query in queries.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
 def get_user_profile(user_id: int, cur) -> Dict[str, Any]:
     """Get complete user profile"""
-    query = load_sql_query('select_full_user_profile.sql')
-    cur.execute(query, (user_id,))
+    execute_query(cur, 'select_full_user_profile.sql', (user_id,))
 
     profile = cur.fetchone()
     return dict(profile) if profile else {}
 
 
 def get_user_workout_history(user_id: int, cur, limit: int = 10) -> List[Dict[str, Any]]:
-    query = load_sql_query('select_ai_user_workout_history.sql')
-    cur.execute(query, (user_id, limit))
+    execute_query(cur, 'select_ai_user_workout_history.sql', (user_id, limit))
 
     return [dict(w) for w in cur.fetchall()]
 
 
 def get_user_strength_progress(user_id: int, cur) -> Dict[str, Dict[str, Any]]:
-    query = load_sql_query('select_user_strength_progress_ai.sql')
-    cur.execute(query, (user_id,))
+    """Best-e1RM set and first-to-latest session e1RM progress for the 10 most recently trained exercises."""
+    execute_query(cur, 'select_user_strength_progress_ai.sql', (user_id,))
 
     result = {}
     for row in cur.fetchall():
         result[row['name']] = {
-            'current_weight': float(row['current_weight']) if row['current_weight'] else 0,
-            'current_reps': int(row['current_reps']) if row['current_reps'] else 0,
-            'progress_percent': 0
+            'current_weight': float(row['current_weight']),
+            'current_reps': int(row['current_reps']),
+            'e1rm': float(row['e1rm']),
+            'best_weight': float(row['best_weight_lb']),
+            # NULL when the first e1RM rounds to 0; there is no meaningful change to report
+            'progress_percent': float(row['progress_percent'] or 0)
         }
 
     return result
@@ -362,13 +594,13 @@ def save_ai_workout_plan(user_id: int, goal: str, workout_data: Dict, cur) -> in
 
 
 def get_recent_soreness_data(user_id: int, cur) -> List[str]:
-    query = load_sql_query('select_recent_soreness.sql')
-    cur.execute(query, (user_id,))
+    execute_query(cur, 'select_recent_soreness.sql', (user_id,))
 
     return [c['category'] for c in cur.fetchall() if c.get('category')]
 
 
-def save_ai_conversation(user_id: int, message: str, response: str, cur, save_to_history: bool = True):
+def save_ai_conversation(user_id: int, message: str, response: str, cur, save_to_history: bool = True,
+                         conversation_id: Optional[int] = None):
     """Save AI conversation to history.
     
     Args:
@@ -377,10 +609,12 @@ def save_ai_conversation(user_id: int, message: str, response: str, cur, save_to
         response: The AI's response
         cur: Database cursor
         save_to_history: If False, conversation won't be saved (e.g., for system prompts like motivational messages)
+        conversation_id: Thread the turn belongs to; its turn count and updated_at are bumped
     """
     if save_to_history:
         query = load_sql_query('insert_ai_conversation.sql')
-        cur.execute(query, (user_id, message, response))
+        cur.execute(query, (user_id, message, response, conversation_id))
+        return cur.fetchone()
 
 
 def update_workout_plan_feedback(plan_id: int, rating: int, notes: str, cur):
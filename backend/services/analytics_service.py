@@ -0,0 +1,64 @@
+from typing import Dict, Any, Iterable, List
+from utils.sql_loader import load_sql_query
+
+# first key of the two-key advisory lock held while writing a user's rollups,
+# so a backfill and a live update never interleave
+ROLLUP_LOCK_NAMESPACE = 1002
+
+
+def _lock_rollups(cur, user_ids: List[int]):
+    cur.execute(load_sql_query('lock_users_rollups.sql'), (ROLLUP_LOCK_NAMESPACE, user_ids))
+
+
+def record_session_rollups(cur, user_id: int, session_id: int):
+    """
+    Adds a just-completed session to the user's daily and ISO-week rollups
+    (one upsert each, in one statement). Call it in the same transaction as the
+    completion, and only when the session actually transitioned to completed.
+    """
+    _lock_rollups(cur, [user_id])
+    cur.execute(load_sql_query('record_session_rollups.sql'), (session_id,))
+
+
+def refresh_session_rollups(cur, user_id: int, session_ids: Iterable[int]):
+    """
+    Recomputes, from workout_sets, the days and weeks that the given sessions
+    count toward. Call it in the transaction that adds or edits sets; sessions
+    that aren't completed yet are skipped, as completion records them.
+    """
+    cur.execute(load_sql_query('select_completed_session_ids.sql'), (list(session_ids), user_id))
+    completed = [row['id'] if isinstance(row, dict) else row[0] for row in cur.fetchall()]
+    if not completed:
+        return
+    _lock_rollups(cur, [user_id])
+    cur.execute(load_sql_query('refresh_session_rollups.sql'), (user_id, completed, user_id))
+
+
+def backfill_training_rollups(conn, chunk_size: int = 200) -> Dict[str, Any]:
+    """
+    Rebuilds the rollups from completed sessions for every user who has any,
+    one chunk of users per transaction. Existing rollup rows for those users
+    are replaced, so it is safe to rerun.
+    """
+    stats = {'users': 0, 'days': 0, 'weeks': 0}
+    last_user_id = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(load_sql_query('select_training_rollup_user_ids.sql'), (last_user_id, chunk_size))
+            user_ids = [row[0] for row in cur.fetchall()]
+            if not user_ids:
+                break
+
+            # completions for these users wait until the chunk commits, then add on top
+            _lock_rollups(cur, user_ids)
+            cur.execute(load_sql_query('delete_training_rollups_for_users.sql'), (user_ids, user_ids))
+            cur.execute(load_sql_query('backfill_daily_training.sql'), (user_ids,))
+            stats['days'] += cur.rowcount
+            cur.execute(load_sql_query('backfill_weekly_training.sql'), (user_ids, user_ids))
+            stats['weeks'] += cur.rowcount
+        conn.commit()
+
+        stats['users'] += len(user_ids)
+        last_user_id = user_ids[-1]
+
+    return stats
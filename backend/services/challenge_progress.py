@@ -0,0 +1,153 @@
+import threading
+from typing import Dict, Any, Iterable, List, Optional
+from psycopg2.extras import RealDictCursor
+from utils.sql_loader import load_sql_query, execute_query
+from services.exercise_catalog import normalize_exercise_key
+from services.challenge_service import challenge_period_keys, update_journey_master
+from services.leaderboard_service import record_activity
+
+# Challenge title -> what logged workout data moves it.
+#   reps:     reps of matching working sets
+#   sets:     number of matching working sets
+#   volume:   reps * weight (lb) of working sets
+#   sessions: completed workout sessions
+#   records:  exercises whose personal record was just beaten
+# Exercises match on their normalized name ('Push-Up' -> 'pushup') or category.
+# Titles missing here are still advanced by the client.
+CHALLENGE_METRICS = {
+    'Push-Up Power': {'metric': 'reps', 'names': ('pushup',)},
+    'Squat Session': {'metric': 'reps', 'names': ('squat',)},
+    'Jumping Jack Jolt': {'metric': 'reps', 'names': ('jumpingjack',)},
+    'Bicep Curl Boost': {'metric': 'reps', 'names': ('curl',), 'exclude': ('leg', 'wrist')},
+    'Lunge Challenge': {'metric': 'reps', 'names': ('lunge',)},
+    'High Knee Hustle': {'metric': 'reps', 'names': ('highknee',)},
+    'Mountain Climber Mayhem': {'metric': 'reps', 'names': ('mountainclimber',)},
+    'Sit-Up Surge': {'metric': 'reps', 'names': ('situp',)},
+    'Burpee Blast': {'metric': 'reps', 'names': ('burpee',)},
+    'Arm Raise Rampage': {'metric': 'reps', 'names': ('armraise', 'lateralraise', 'frontraise')},
+    'Stretch it Out': {'metric': 'sets', 'categories': ('stretching',)},
+    'Total Volume': {'metric': 'volume'},
+    'Heavy Lifter': {'metric': 'volume'},
+    'New PR': {'metric': 'records'},
+    '3-Workout Week': {'metric': 'sessions'},
+    'Centurion': {'metric': 'sessions'},
+}
+
+# passed to the manual increment queries, which leave these challenges untouched
+AUTO_TRACKED_TITLES = sorted(CHALLENGE_METRICS)
+
+# exercise id -> (normalized name, lowercased category); exercises rarely change
+_exercise_cache: Dict[int, tuple] = {}
+_exercise_cache_lock = threading.Lock()
+
+
+def _exercise_info(exercise_ids: Iterable[int], cur) -> Dict[int, tuple]:
+    exercise_ids = set(exercise_ids)
+    missing = [exercise_id for exercise_id in exercise_ids if exercise_id not in _exercise_cache]
+    if missing:
+        with cur.connection.cursor(cursor_factory=RealDictCursor) as lookup:
+            lookup.execute(load_sql_query('select_exercise_names_by_ids.sql'), (missing,))
+            rows = lookup.fetchall()
+        with _exercise_cache_lock:
+            for row in rows:
+                _exercise_cache[row['id']] = (normalize_exercise_key(row['name']), (row['category'] or '').lower())
+    return {exercise_id: _exercise_cache[exercise_id] for exercise_id in exercise_ids if exercise_id in _exercise_cache}
+
+
+def _matches(spec: Dict[str, Any], info: tuple) -> bool:
+    name, category = info
+    if any(word in name for word in spec.get('exclude', ())):
+        return False
+    return (any(word in name for word in spec.get('names', ()))
+            or category in spec.get('categories', ()))
+
+
+def is_auto_tracked(challenge_title: str) -> bool:
+    """True if logged workouts advance the challenge; the client must not increment it too."""
+    return challenge_title in CHALLENGE_METRICS
+
+
+def _is_filled(workout_set: Dict[str, Any]) -> bool:
+    return (workout_set.get('reps_completed') or 0) > 0 or float(workout_set.get('weight_lb') or 0) > 0
+
+
+def set_change(new_set: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Describes how a logged or edited set changes the progress metrics.
+    For an edit, pass the row's previous reps/weight so only the difference counts;
+    an edit only counts as a set when it fills in a set that had no reps or weight
+    (e.g. one prefilled from the template), or takes one back when it empties it.
+    """
+    reps = new_set.get('reps_completed') or 0
+    weight = float(new_set.get('weight_lb') or 0)
+    count = 1
+    if previous is not None:
+        prev_reps = previous.get('reps_completed') or 0
+        prev_weight = float(previous.get('weight_lb') or 0)
+        volume = reps * weight - prev_reps * prev_weight
+        count = int(_is_filled(new_set)) - int(_is_filled(previous))
+        reps = reps - prev_reps
+    else:
+        volume = reps * weight
+    return {
+        'exercise_id': new_set['exercise_id'],
+        'is_warmup': bool(new_set.get('is_warmup')),
+        'reps': reps,
+        'sets': count,
+        'volume': volume
+    }
+
+
+def _challenge_deltas(set_changes: List[Dict[str, Any]], sessions_completed: int, new_records: int,
+                      cur) -> Dict[str, float]:
+    working = [change for change in set_changes if not change['is_warmup']]
+    info = _exercise_info((change['exercise_id'] for change in working), cur) if working else {}
+
+    deltas = {}
+    for title, spec in CHALLENGE_METRICS.items():
+        metric = spec['metric']
+        if metric == 'sessions':
+            delta = sessions_completed
+        elif metric == 'records':
+            delta = new_records
+        elif metric == 'volume':
+            delta = sum(change['volume'] for change in working)
+        else:
+            delta = sum(
+                change[metric] for change in working
+                if change['exercise_id'] in info and _matches(spec, info[change['exercise_id']])
+            )
+        if delta:
+            deltas[title] = delta
+    return deltas
+
+
+def apply_workout_progress(conn, user_id: int, set_changes: List[Dict[str, Any]] = (),
+                           sessions_completed: int = 0, new_records: int = 0) -> List[Dict[str, Any]]:
+    """
+    Moves the user's current challenges by what was just logged, in one UPDATE.
+    Runs after the workout write has committed; a failure here is logged and
+    never undoes the workout data. Returns the challenge rows that changed.
+    """
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            deltas = _challenge_deltas(list(set_changes), sessions_completed, new_records, cur)
+            if not deltas:
+                return []
+
+            period_keys = challenge_period_keys()
+            execute_query(cur, 'apply_challenge_progress.sql', (
+                list(deltas), list(deltas.values()), user_id, period_keys['Daily'], period_keys['Weekly']
+            ))
+            changed = cur.fetchall()
+
+            completed_types = [row['challenge_type'] for row in changed if row['is_completed']]
+            if 'All-Time' in completed_types and update_journey_master(user_id, cur):
+                completed_types.append('All-Time')
+            record_activity(cur, user_id, completed_challenge_types=completed_types)
+        conn.commit()
+        return changed
+    except Exception as e:
+        conn.rollback()
+        print(f"Warning: could not update challenge progress for user {user_id}: {e}")
+        return []
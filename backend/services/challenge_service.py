@@ -1,6 +1,6 @@
 import random
 import datetime
-from utils.sql_loader import load_sql_query
+from utils.sql_loader import load_sql_query, execute_query
 
 CHALLENGE_TEMPLATES = {
     'Daily': [
@@ -47,86 +47,134 @@ CHALLENGE_TEMPLATES = {
 }
 DAILY_CHALLENGE_COUNT = 5
 WEEKLY_CHALLENGE_COUNT = 3
+ALL_TIME_PERIOD_KEY = 'all-time'
+# first key of the two-key advisory lock taken while (re)generating a user's challenges
+CHALLENGE_LOCK_NAMESPACE = 1001
+
+
+def challenge_period_keys(now=None):
+    """
+    Period keys for the current UTC day and ISO week, e.g.
+    {'Daily': '2025-03-14', 'Weekly': '2025-W11', 'All-Time': 'all-time'}.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    iso_year, iso_week, _ = now.date().isocalendar()
+    return {
+        'Daily': now.date().isoformat(),
+        'Weekly': f"{iso_year}-W{iso_week:02d}",
+        'All-Time': ALL_TIME_PERIOD_KEY
+    }
+
+
+def _pick_challenges(challenge_type, period_key):
+    """Rows (type, title, goal, progress, period key) for a fresh set of challenges."""
+    if challenge_type == 'Daily':
+        templates = random.sample(CHALLENGE_TEMPLATES['Daily'], DAILY_CHALLENGE_COUNT)
+    elif challenge_type == 'Weekly':
+        templates = random.sample(CHALLENGE_TEMPLATES['Weekly'], WEEKLY_CHALLENGE_COUNT)
+    else:
+        templates = CHALLENGE_TEMPLATES['All-Time']
+
+    rows = []
+    for challenge in templates:
+        progress = 0
+        if challenge['title'] == 'First Time':
+            # completed by the first check itself
+            progress = challenge['goal']
+        elif challenge['title'] == 'Journey Master':
+            # 'First Time' is the only other All-Time challenge done at this point
+            progress = 1
+        rows.append((challenge_type, challenge['title'], challenge['goal'], progress, period_key))
+    return rows
+
+
+def _current_challenge_types(user_id, period_keys, cur):
+    execute_query(cur, 'select_current_challenge_types.sql', (user_id, period_keys['Daily'], period_keys['Weekly']))
+    # called with both RealDictCursor (challenges API) and plain cursors (registration)
+    return {row['challenge_type'] if isinstance(row, dict) else row[0] for row in cur.fetchall()}
+
 
 def _ensure_current_challenges(user_id, cur):
     """
-    Checks if a user has active daily and weekly challenges for the current period.
-    If not, it deletes the old ones and generates a new set.
-    It also ensures All-Time challenges are created on first-time check.
+    Makes sure the user has Daily and Weekly challenges for the current period
+    and their All-Time challenges. When everything is current this is a single
+    indexed query; otherwise stale challenges are replaced under a per-user
+    advisory lock so concurrent requests don't generate twice.
     """
     now = datetime.datetime.now(datetime.timezone.utc)
-    today = now.date()
-    
-
-    # 1. Check for existing Daily challenges for today
-    check_daily_sql = load_sql_query('check_daily_challenges.sql')
-    cur.execute(check_daily_sql, (user_id, today))
-    has_daily = cur.fetchone()
-
-    if not has_daily:
-        # Delete old Daily challenges
-        delete_challenges_sql = load_sql_query('delete_challenges_by_type.sql')
-        cur.execute(delete_challenges_sql, (user_id, 'Daily'))
-        
-        # Create new Daily challenges
-        daily_templates = random.sample(CHALLENGE_TEMPLATES['Daily'], DAILY_CHALLENGE_COUNT)
-        insert_challenge_sql = load_sql_query('insert_challenge.sql')
-        for challenge in daily_templates:
-            cur.execute(insert_challenge_sql, (user_id, 'Daily', challenge['title'], challenge['goal'], now, now))
-
-    # 2. Check for existing Weekly challenges for this week
-    # The 'week' part of ISO 8601 week date system is used to identify the week.
-    current_week = today.isocalendar()[1]
-    current_year = today.isocalendar()[0]
-
-    check_weekly_sql = load_sql_query('check_weekly_challenges.sql')
-    cur.execute(check_weekly_sql, (user_id, current_week, current_year))
-    has_weekly = cur.fetchone()
-
-    if not has_weekly:
-        # Delete old Weekly challenges
-        delete_challenges_sql = load_sql_query('delete_challenges_by_type.sql')
-        cur.execute(delete_challenges_sql, (user_id, 'Weekly'))
-        
-        # Create new Weekly challenges
-        weekly_templates = random.sample(CHALLENGE_TEMPLATES['Weekly'], WEEKLY_CHALLENGE_COUNT)
-        insert_challenge_sql = load_sql_query('insert_challenge.sql')
-        for challenge in weekly_templates:
-            cur.execute(insert_challenge_sql, (user_id, 'Weekly', challenge['title'], challenge['goal'], now, now))
-
-    # 3. Check for All-Time challenges (run once)
-    check_all_time_sql = load_sql_query('check_all_time_challenges.sql')
-    cur.execute(check_all_time_sql, (user_id,))
-    has_all_time = cur.fetchone()
-
-    if not has_all_time:
-        # Create All-Time challenges
-        insert_challenge_sql = load_sql_query('insert_challenge.sql')
-        for challenge in CHALLENGE_TEMPLATES['All-Time']:
-            cur.execute(insert_challenge_sql, (user_id, 'All-Time', challenge['title'], challenge['goal'], now, now))
-        # Special case: Mark 'First Time' login challenge as complete immediately
-        complete_first_time_sql = load_sql_query('complete_first_time_challenge.sql')
-        cur.execute(complete_first_time_sql, (now, user_id))
-        # After completing 'First Time', update 'Journey Master'
-        update_journey_master(user_id, cur)
+    period_keys = challenge_period_keys(now)
 
-def update_journey_master(user_id, cur):
+    current = _current_challenge_types(user_id, period_keys, cur)
+    if len(current) == len(period_keys):
+        return period_keys
+
+    execute_query(cur, 'lock_user_challenges.sql', (CHALLENGE_LOCK_NAMESPACE, user_id))
+    # another request may have generated them while we waited for the lock
+    current = _current_challenge_types(user_id, period_keys, cur)
+
+    rows = []
+    for challenge_type, period_key in period_keys.items():
+        if challenge_type in current:
+            continue
+        if challenge_type != 'All-Time':
+            execute_query(cur, 'delete_expired_challenges.sql', (user_id, challenge_type, period_key))
+        rows.extend(_pick_challenges(challenge_type, period_key))
+
+    if rows:
+        types, titles, goals, progress, keys = (list(column) for column in zip(*rows))
+        execute_query(cur, 'insert_challenges_batch.sql', (user_id, now, now, types, titles, goals, progress, keys))
+    return period_keys
+
+
+def pregenerate_challenges(conn, ahead_hours=6, chunk_size=500, active_days=30):
     """
-    Calculates the number of completed All-Time challenges and updates Journey Master's progress.
+    Creates Daily and Weekly challenges for the current period and for the one
+    starting within the next `ahead_hours`, for every user active in the last
+    `active_days`, so the first app open after a boundary only reads.
+    Users are processed in chunks, one transaction per chunk.
     """
-    # 1. Count completed, non-'Journey Master' All-Time challenges
-    count_sql = load_sql_query('count_completed_all_time_challenges.sql')
-    cur.execute(count_sql, (user_id,))
-    
-    row = cur.fetchone()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    current_keys = challenge_period_keys(now)
+    upcoming_keys = challenge_period_keys(now + datetime.timedelta(hours=ahead_hours))
 
-    if row:
-        completed_count = row[0] 
-    else:
-        completed_count = 0
+    stats = {'users': 0, 'inserted': 0, 'deleted': 0}
+    last_user_id = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(load_sql_query('select_active_challenge_user_ids.sql'),
+                        (last_user_id, active_days, active_days, chunk_size))
+            user_ids = [row[0] for row in cur.fetchall()]
+            if not user_ids:
+                break
+
+            # same per-user lock as _ensure_current_challenges, taken in id order
+            cur.execute(load_sql_query('lock_users_challenges.sql'), (CHALLENGE_LOCK_NAMESPACE, user_ids))
+
+            cur.execute(load_sql_query('delete_expired_challenges_for_users.sql'),
+                        (user_ids, current_keys['Daily'], current_keys['Weekly']))
+            stats['deleted'] += cur.rowcount
 
-    # 2. Update Journey Master progress and status
-    update_jm_sql = load_sql_query('update_journey_master_progress.sql')
-    
-    # Now passing an integer (completed_count) instead of a RealDictRow
-    cur.execute(update_jm_sql, (completed_count, completed_count, user_id))
\ No newline at end of file
+            rows = []
+            for user_id in user_ids:
+                for challenge_type in ('Daily', 'Weekly'):
+                    for period_key in {current_keys[challenge_type], upcoming_keys[challenge_type]}:
+                        rows.extend((user_id,) + row for row in _pick_challenges(challenge_type, period_key))
+            columns = [list(column) for column in zip(*rows)]
+            cur.execute(load_sql_query('insert_challenges_for_users.sql'), [now, now] + columns)
+            stats['inserted'] += cur.rowcount
+        conn.commit()
+
+        stats['users'] += len(user_ids)
+        last_user_id = user_ids[-1]
+
+    return stats
+
+def update_journey_master(user_id, cur):
+    """
+    Sets Journey Master's progress to the number of completed All-Time challenges,
+    counting and updating in a single statement. Returns True if this completed it.
+    Expects a RealDictCursor.
+    """
+    cur.execute(load_sql_query('update_journey_master_progress.sql'), (user_id, user_id))
+    row = cur.fetchone()
+    return bool(row and row['is_completed'])
@@ -0,0 +1,101 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from psycopg2.extras import RealDictCursor
+from utils.sql_loader import load_sql_query, execute_query
+from utils.db_pool import pooled_connection
+from services.ai_service import fitness_ai_agent, save_ai_conversation
+
+# Turns sent verbatim with each chat message; older ones live in the thread's summary
+AI_CHAT_WINDOW_TURNS = int(os.getenv("AI_CHAT_WINDOW_TURNS", 8))
+# Unsummarized turns beyond the window that trigger a background compaction
+AI_SUMMARY_BATCH_TURNS = int(os.getenv("AI_SUMMARY_BATCH_TURNS", 4))
+# Most turns folded into the summary per compaction; anything older is skipped
+AI_SUMMARY_MAX_TURNS = int(os.getenv("AI_SUMMARY_MAX_TURNS", 40))
+MAX_TITLE_LENGTH = 80
+
+_summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-summary')
+_compacting = set()
+_compacting_lock = threading.Lock()
+
+
+def load_conversation(cur, user_id: int, conversation_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    The thread with its rolling summary and the turns not yet folded into it
+    (newest AI_CHAT_WINDOW_TURNS + AI_SUMMARY_BATCH_TURNS at most), oldest first.
+    Without an id, the user's most recently active thread. None if there is none.
+    """
+    execute_query(cur, 'select_ai_conversation_window.sql', (
+        AI_CHAT_WINDOW_TURNS + AI_SUMMARY_BATCH_TURNS, user_id, conversation_id, conversation_id
+    ))
+    conversation = cur.fetchone()
+    return dict(conversation) if conversation else None
+
+
+def new_conversation() -> Dict[str, Any]:
+    """A thread that is only created once its first turn is saved."""
+    return {'id': None, 'title': '', 'summary': '', 'summarized_through_id': None, 'turn_count': 0, 'turns': []}
+
+
+def conversation_messages(conversation: Dict[str, Any]) -> List[Dict[str, str]]:
+    messages = []
+    for turn in conversation['turns']:
+        messages.append({'role': 'user', 'content': turn['message']})
+        messages.append({'role': 'assistant', 'content': turn['response']})
+    return messages
+
+
+def save_turn(cur, user_id: int, conversation: Dict[str, Any], message: str, response: str) -> int:
+    """Saves the exchange in the caller's transaction, creating the thread first if needed.
+    Returns the conversation id."""
+    if conversation['id'] is None:
+        cur.execute(load_sql_query('insert_ai_conversation_thread.sql'), (user_id, (message or '')[:MAX_TITLE_LENGTH]))
+        conversation['id'] = cur.fetchone()['id']
+    save_ai_conversation(user_id, message, response, cur, conversation_id=conversation['id'])
+    return conversation['id']
+
+
+def compact_in_background(conversation: Dict[str, Any]):
+    """
+    Once the saved turns outside the window reach AI_SUMMARY_BATCH_TURNS, folds
+    them into the thread's summary on a background thread. Call after commit.
+    """
+    unsummarized = len(conversation['turns']) + 1
+    if unsummarized < AI_CHAT_WINDOW_TURNS + AI_SUMMARY_BATCH_TURNS:
+        return
+    with _compacting_lock:
+        if conversation['id'] in _compacting:
+            return
+        _compacting.add(conversation['id'])
+    _summary_executor.submit(_compact, conversation['id'])
+
+
+def _compact(conversation_id: int):
+    try:
+        with pooled_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(load_sql_query('select_ai_conversation_turns_to_summarize.sql'), (
+                    conversation_id, AI_CHAT_WINDOW_TURNS, AI_SUMMARY_MAX_TURNS
+                ))
+                rows = cur.fetchall()
+            conn.commit()
+        if not rows:
+            return
+
+        # the connection goes back to the pool for the model call
+        turns = list(reversed(rows))
+        summary = fitness_ai_agent.summarize_conversation(rows[0]['summary'], turns)
+
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(load_sql_query('update_ai_conversation_summary.sql'), (
+                    summary, turns[-1]['id'], conversation_id, rows[0]['summarized_through_id']
+                ))
+            conn.commit()
+        print(f"AI conversation {conversation_id}: summarized {len(turns)} turns through {turns[-1]['id']}")
+    except Exception as e:
+        print(f"Warning: could not summarize AI conversation {conversation_id}: {e}")
+    finally:
+        with _compacting_lock:
+            _compacting.discard(conversation_id)
@@ -0,0 +1,150 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+CATALOG_URL = "https://raw.githubusercontent.com/yuhonas/free-exercise-db/main/dist/exercises.json"
+SNAPSHOT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'exercises.json'
+)
+
+
+def normalize_exercise_key(value: Any) -> str:
+    """'Barbell_Bench_Press_-_Medium_Grip' and 'Barbell Bench Press - Medium Grip'
+    both become 'barbellbenchpressmediumgrip'. Non-string values (ids from the
+    model can be numbers) are stringified first."""
+    if value is None:
+        return ''
+    return re.sub(r'[^a-z0-9]', '', str(value).lower())
+
+
+def _content_hash(exercises: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(exercises, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ExerciseCatalog:
+    """free-exercise-db snapshot, read from disk on first use and indexed in memory."""
+
+    def __init__(self, snapshot_path: str = SNAPSHOT_PATH):
+        self.snapshot_path = snapshot_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.version = None
+        self.exercises: List[Dict[str, Any]] = []
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        # normalized id and normalized name -> exercise, for near-miss lookups
+        self.by_key: Dict[str, Dict[str, Any]] = {}
+        self.by_muscle: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_equipment: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_category: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._load()
+            self._loaded = True
+
+    def _load(self):
+        if not os.path.exists(self.snapshot_path):
+            # an empty catalog would silently strip instructions and images from every plan
+            raise RuntimeError(f"Exercise catalog snapshot missing at {self.snapshot_path}; "
+                               f"run 'flask --app app refresh-exercise-catalog'")
+
+        with open(self.snapshot_path, 'r') as f:
+            snapshot = json.load(f)
+
+        exercises = snapshot.get('exercises', [])
+        if snapshot.get('sha256') != _content_hash(exercises):
+            print("WARNING: exercise catalog snapshot hash does not match its contents")
+
+        self.version = snapshot.get('sha256')
+        self.exercises = exercises
+        self._build_indexes()
+
+    def _build_indexes(self):
+        self.by_id, self.by_key = {}, {}
+        self.by_muscle, self.by_equipment, self.by_category = {}, {}, {}
+        for ex in self.exercises:
+            self.by_id[ex['id']] = ex
+            self.by_key.setdefault(normalize_exercise_key(ex['id']), ex)
+            self.by_key.setdefault(normalize_exercise_key(ex.get('name')), ex)
+            for muscle in ex.get('primaryMuscles', []):
+                self.by_muscle.setdefault(muscle.lower(), []).append(ex)
+            if ex.get('equipment'):
+                self.by_equipment.setdefault(ex['equipment'].lower(), []).append(ex)
+            if ex.get('category'):
+                self.by_category.setdefault(ex['category'].lower(), []).append(ex)
+
+    def all(self) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self.exercises
+
+    def get(self, exercise_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self.by_id.get(exercise_id)
+
+    def find_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self.by_key.get(normalize_exercise_key(name))
+
+    def resolve(self, exercise_id: Any, name: Any = None) -> Optional[Dict[str, Any]]:
+        """Exact id first, then the normalized id, then the normalized name.
+        Values that aren't strings or numbers (e.g. a list from the model) are ignored."""
+        self._ensure_loaded()
+        if not isinstance(exercise_id, (str, int, float)):
+            exercise_id = None
+        if not isinstance(name, (str, int, float)):
+            name = None
+        if isinstance(exercise_id, str) and exercise_id in self.by_id:
+            return self.by_id[exercise_id]
+        for key in (normalize_exercise_key(exercise_id), normalize_exercise_key(name)):
+            if key and key in self.by_key:
+                return self.by_key[key]
+        return None
+
+    def for_muscle(self, muscle: str) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self.by_muscle.get(muscle.lower(), [])
+
+    def for_equipment(self, equipment: str) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self.by_equipment.get(equipment.lower(), [])
+
+    def for_category(self, category: str) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self.by_category.get(category.lower(), [])
+
+
+def refresh_catalog(snapshot_path: str = SNAPSHOT_PATH, url: str = CATALOG_URL) -> Dict[str, Any]:
+    """Downloads the exercise database and rewrites the local snapshot."""
+    import requests
+
+    res = requests.get(url, timeout=30)
+    res.raise_for_status()
+    exercises = res.json()
+
+    snapshot = {
+        'source': url,
+        'fetched_at': datetime.now(timezone.utc).isoformat(),
+        'count': len(exercises),
+        'sha256': _content_hash(exercises),
+        'exercises': exercises
+    }
+
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    tmp_path = snapshot_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f, indent=1)
+    os.replace(tmp_path, snapshot_path)
+
+    return {key: snapshot[key] for key in ('source', 'fetched_at', 'count', 'sha256')}
+
+
+exercise_catalog = ExerciseCatalog()
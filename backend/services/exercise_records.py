@@ -0,0 +1,105 @@
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from utils.sql_loader import load_sql_query, execute_query
+
+
+def estimated_1rm(weight_lb, reps) -> float:
+    """Epley estimate; a single is taken at face value."""
+    weight_lb = float(weight_lb or 0)
+    reps = reps or 0
+    if weight_lb <= 0 or reps <= 0:
+        return 0.0
+    return weight_lb if reps == 1 else weight_lb * (1 + reps / 30.0)
+
+
+def _counts_toward_records(workout_set: Dict[str, Any]) -> bool:
+    return (not workout_set.get('is_warmup')
+            and float(workout_set.get('weight_lb') or 0) > 0
+            and (workout_set.get('reps_completed') or 0) > 0)
+
+
+def record_sets(cur, user_id: int, logged_sets: Iterable[Dict[str, Any]] = (),
+                edited_sets: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]] = ()) -> List[Dict[str, Any]]:
+    """
+    Folds newly logged sets, and edits given as (updated_set, previous) pairs,
+    into user_exercise_records in the caller's transaction. Bests only ever
+    move up incrementally; an edit that lowers a set's weight or e1RM may
+    have lowered a record, so that exercise is rebuilt from its history.
+    Returns the records that were beaten, one row per exercise.
+    """
+    rows = []
+    rebuild = set()
+    for workout_set in logged_sets:
+        if _counts_toward_records(workout_set):
+            rows.append((workout_set, 1))
+    for updated_set, previous in edited_sets:
+        if updated_set.get('is_warmup'):
+            continue
+        if (float(updated_set.get('weight_lb') or 0) < float(previous.get('weight_lb') or 0)
+                or estimated_1rm(updated_set.get('weight_lb'), updated_set.get('reps_completed'))
+                < estimated_1rm(previous.get('weight_lb'), previous.get('reps_completed'))):
+            rebuild.add(updated_set['exercise_id'])
+        elif _counts_toward_records(updated_set):
+            # an edit never adds a set, unless the set only now has a weight and reps
+            rows.append((updated_set, 0 if _counts_toward_records(previous) else 1))
+    rows = [(workout_set, counted) for workout_set, counted in rows if workout_set['exercise_id'] not in rebuild]
+
+    new_records = []
+    if rows:
+        execute_query(cur, 'record_exercise_records.sql', (
+            [workout_set['exercise_id'] for workout_set, _ in rows],
+            [workout_set['session_id'] for workout_set, _ in rows],
+            [workout_set['weight_lb'] for workout_set, _ in rows],
+            [workout_set['reps_completed'] for workout_set, _ in rows],
+            [counted for _, counted in rows],
+            user_id
+        ))
+        for row in cur.fetchall():
+            if row['previous_best_e1rm_lb'] is None:
+                continue  # first time the exercise was logged, nothing was beaten
+            if (row['best_e1rm_lb'] > row['previous_best_e1rm_lb']
+                    or row['best_weight_lb'] > row['previous_best_weight_lb']):
+                new_records.append({
+                    'exercise_id': row['exercise_id'],
+                    'best_e1rm_lb': float(row['best_e1rm_lb']),
+                    'best_weight_lb': float(row['best_weight_lb'])
+                })
+
+    if rebuild:
+        rebuild_records(cur, [user_id], sorted(rebuild))
+
+    return new_records
+
+
+def rebuild_records(cur, user_ids: List[int], exercise_ids: Optional[List[int]] = None) -> int:
+    """Recomputes records from workout_sets for the given users (optionally only some exercises)."""
+    cur.execute(load_sql_query('delete_exercise_records.sql'), (user_ids, exercise_ids, exercise_ids))
+    cur.execute(load_sql_query('rebuild_exercise_records.sql'), (user_ids, exercise_ids, exercise_ids))
+    return cur.rowcount
+
+
+def get_records(cur, user_id: int, exercise_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """The user's records, best e1RM first; a primary-key range scan on user_exercise_records."""
+    execute_query(cur, 'select_exercise_records.sql', (user_id, exercise_id, exercise_id))
+    return cur.fetchall()
+
+
+def backfill_exercise_records(conn, chunk_size: int = 200) -> Dict[str, Any]:
+    """
+    Rebuilds user_exercise_records from logged sets for every user with a
+    workout session, one chunk of users per transaction. Safe to rerun.
+    """
+    stats = {'users': 0, 'records': 0}
+    last_user_id = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(load_sql_query('select_record_user_ids.sql'), (last_user_id, chunk_size))
+            user_ids = [row[0] for row in cur.fetchall()]
+            if not user_ids:
+                break
+            stats['records'] += rebuild_records(cur, user_ids)
+        conn.commit()
+
+        stats['users'] += len(user_ids)
+        last_user_id = user_ids[-1]
+
+    return stats
@@ -0,0 +1,102 @@
+import psycopg2
+from typing import Iterable, List, Dict, Any, Optional
+from utils.sql_loader import load_sql_query, execute_query
+
+POINTS_PER_WORKOUT = 10
+POINTS_PER_CHALLENGE = {
+    'Daily': 5,
+    'Weekly': 20,
+    'All-Time': 50,
+}
+
+
+def record_activity(cur, user_id: int, workouts: int = 0, calories: int = 0,
+                    completed_challenge_types: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    Adds a workout and/or newly completed challenges to the user's leaderboard
+    totals in one upsert. Call it in the same transaction as the change it
+    records, and only for transitions (a session or challenge completing), so
+    retries never count twice.
+    """
+    completed_challenge_types = list(completed_challenge_types)
+    if not workouts and not completed_challenge_types:
+        return None
+
+    points = workouts * POINTS_PER_WORKOUT + sum(
+        POINTS_PER_CHALLENGE.get(challenge_type, 0) for challenge_type in completed_challenge_types
+    )
+    execute_query(cur, 'record_leaderboard_activity.sql', (
+        user_id, points, workouts, len(completed_challenge_types), calories or 0
+    ))
+    entry = cur.fetchone()
+    if workouts:
+        update_streak(cur, user_id)
+    return entry
+
+
+def update_streak(cur, user_id: int):
+    """
+    Advances the workout streak in O(1) from the stored last active day, where
+    days are the user's local days (profiles.timezone):
+    same day -> unchanged, the day after -> +1, later -> back to 1.
+    Runs in a savepoint: a failed streak update is logged and skipped rather
+    than aborting the caller's transaction (e.g. completing a workout).
+    """
+    cur.execute("SAVEPOINT update_streak")
+    try:
+        cur.execute(load_sql_query('update_leaderboard_streak.sql'), (user_id, user_id))
+        streak = cur.fetchone()
+    except psycopg2.Error as e:
+        cur.execute("ROLLBACK TO SAVEPOINT update_streak")
+        print(f"Warning: could not update streak for user {user_id}: {e}")
+        return None
+    cur.execute("RELEASE SAVEPOINT update_streak")
+    return streak
+
+
+def get_top(cur, limit: int) -> List[Dict[str, Any]]:
+    """Highest totals first, read straight off the (total_points, user_id) index."""
+    execute_query(cur, 'select_leaderboard_top.sql', (limit,))
+    return cur.fetchall()
+
+
+def get_neighbours(cur, user_id: int, count: int) -> Optional[Dict[str, Any]]:
+    """
+    The user's entry with up to `count` entries ranked just above and below,
+    found by keyset lookups on the points index. Ranks come from the last
+    refresh-leaderboard-ranks run; an unranked user gets a live count.
+    """
+    execute_query(cur, 'select_leaderboard_entry.sql', (user_id,))
+    me = cur.fetchone()
+    if not me:
+        return None
+
+    me = dict(me)
+    if me['rank'] is None:
+        execute_query(cur, 'count_leaderboard_ahead.sql', (me['total_points'],))
+        me['rank'] = cur.fetchone()['rank']
+
+    execute_query(cur, 'select_leaderboard_above.sql', (me['total_points'], user_id, count))
+    above = list(reversed(cur.fetchall()))
+    execute_query(cur, 'select_leaderboard_below.sql', (me['total_points'], user_id, count))
+    below = cur.fetchall()
+
+    return {'me': me, 'above': above, 'below': below}
+
+
+def reset_broken_streaks(conn) -> int:
+    """Zeroes current streaks whose last active day is before the user's local yesterday."""
+    with conn.cursor() as cur:
+        cur.execute(load_sql_query('reset_broken_streaks.sql'))
+        updated = cur.rowcount
+    conn.commit()
+    return updated
+
+
+def refresh_ranks(conn) -> int:
+    """Rewrites the materialized rank column; only rows whose rank moved are touched."""
+    with conn.cursor() as cur:
+        cur.execute(load_sql_query('refresh_leaderboard_ranks.sql'))
+        updated = cur.rowcount
+    conn.commit()
+    return updated
@@ -0,0 +1,110 @@
+import os
+import math
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # optional: without it token counts are estimated from length
+    tiktoken = None
+
+# Input-token budgets per AI call (prompt only; max_tokens for the reply is separate)
+AI_CHAT_INPUT_TOKENS = int(os.getenv("AI_CHAT_INPUT_TOKENS", 4000))
+AI_WORKOUT_INPUT_TOKENS = int(os.getenv("AI_WORKOUT_INPUT_TOKENS", 3000))
+AI_ANALYSIS_INPUT_TOKENS = int(os.getenv("AI_ANALYSIS_INPUT_TOKENS", 3000))
+AI_DELOAD_INPUT_TOKENS = int(os.getenv("AI_DELOAD_INPUT_TOKENS", 2000))
+
+# Caps on the user-context sections
+AI_CONTEXT_MAX_WORKOUTS = int(os.getenv("AI_CONTEXT_MAX_WORKOUTS", 5))
+AI_CONTEXT_MAX_LIFTS = int(os.getenv("AI_CONTEXT_MAX_LIFTS", 8))
+AI_CONTEXT_MAX_TEXT_CHARS = int(os.getenv("AI_CONTEXT_MAX_TEXT_CHARS", 300))
+
+# Length of the rolling summary kept for each chat conversation
+AI_SUMMARY_MAX_WORDS = int(os.getenv("AI_SUMMARY_MAX_WORDS", 200))
+
+# chat format overhead, as counted by OpenAI: per message, and once to prime the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # the encoding file is downloaded on first use
+        print(f"Warning: tiktoken encoding unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def clip_text(text: Any, max_chars: Optional[int] = None) -> str:
+    max_chars = max_chars or AI_CONTEXT_MAX_TEXT_CHARS
+    text = str(text)
+    return text if len(text) <= max_chars else text[:max_chars - 3].rstrip() + '...'
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    return TOKENS_PER_REPLY + sum(
+        TOKENS_PER_MESSAGE + count_tokens(message.get('content')) for message in messages
+    )
+
+
+def clean_history(conversation_history: Any) -> List[Dict[str, str]]:
+    """Keeps only well-formed user/assistant turns; clients can't inject system messages."""
+    if not isinstance(conversation_history, list):
+        return []
+    return [
+        {'role': turn['role'], 'content': turn['content']}
+        for turn in conversation_history
+        if isinstance(turn, dict) and turn.get('role') in ('user', 'assistant')
+        and isinstance(turn.get('content'), str) and turn['content']
+    ]
+
+
+def fit_chat_messages(prefix: List[Dict[str, str]], history: List[Dict[str, str]],
+                      final: Dict[str, str], budget: int) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+    """
+    prefix + as many of the newest history turns as fit in `budget` + final.
+    Older turns are dropped first; the prefix and the new message are always
+    sent, even if they alone exceed the budget. Returns (messages, usage).
+    """
+    used = count_message_tokens(prefix + [final])
+    kept = []
+    for turn in reversed(history):
+        cost = TOKENS_PER_MESSAGE + count_tokens(turn['content'])
+        if used + cost > budget:
+            break
+        kept.append(turn)
+        used += cost
+    kept.reverse()
+    # don't open the kept window on a reply whose question was dropped
+    if len(kept) < len(history) and kept and kept[0]['role'] == 'assistant':
+        used -= TOKENS_PER_MESSAGE + count_tokens(kept.pop(0)['content'])
+
+    usage = {
+        'prompt_tokens': used,
+        'prompt_token_budget': budget,
+        'history_messages': len(kept),
+        'history_messages_dropped': len(history) - len(kept),
+        'token_counter': 'tiktoken' if _encoding() is not None else 'estimate'
+    }
+    return prefix + kept + [final], usage
+
+
+def prompt_usage(messages: List[Dict[str, str]], budget: int) -> Dict[str, Any]:
+    return {
+        'prompt_tokens': count_message_tokens(messages),
+        'prompt_token_budget': budget,
+        'token_counter': 'tiktoken' if _encoding() is not None else 'estimate'
+    }
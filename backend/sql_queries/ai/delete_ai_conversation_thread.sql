@@ -0,0 +1,3 @@
+DELETE FROM ai_conversation_threads
+WHERE id = %s AND user_id = %s
+RETURNING id, turn_count;
@@ -1 +1,4 @@
-DELETE FROM ai_conversations WHERE user_id = %s;
\ No newline at end of file
+WITH threads AS (
+    DELETE FROM ai_conversation_threads WHERE user_id = %s
+)
+DELETE FROM ai_conversations WHERE user_id = %s;
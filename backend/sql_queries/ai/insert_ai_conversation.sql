@@ -1,3 +1,13 @@
-INSERT INTO ai_conversations (user_id, message, response)
-VALUES (%s, %s, %s)
-RETURNING id, user_id, message, response, created_at;
\ No newline at end of file
+WITH turn AS (
+    INSERT INTO ai_conversations (user_id, message, response, conversation_id)
+    VALUES (%s, %s, %s, %s)
+    RETURNING id, user_id, conversation_id, message, response, created_at
+),
+thread AS (
+    UPDATE ai_conversation_threads t
+    SET turn_count = t.turn_count + 1,
+        updated_at = NOW()
+    FROM turn
+    WHERE t.id = turn.conversation_id
+)
+SELECT * FROM turn;
@@ -0,0 +1,3 @@
+INSERT INTO ai_conversation_threads (user_id, title)
+VALUES (%s, %s)
+RETURNING id;
@@ -0,0 +1,5 @@
+SELECT id, title, turn_count, created_at, updated_at
+FROM ai_conversation_threads
+WHERE user_id = %s AND (%s::int IS NULL OR id < %s)
+ORDER BY id DESC
+LIMIT %s;
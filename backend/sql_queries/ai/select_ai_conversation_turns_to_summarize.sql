@@ -0,0 +1,7 @@
+SELECT t.summary, t.summarized_through_id, c.id, c.message, c.response
+FROM ai_conversation_threads t
+JOIN ai_conversations c ON c.conversation_id = t.id AND c.id > COALESCE(t.summarized_through_id, 0)
+WHERE t.id = %s
+ORDER BY c.id DESC
+OFFSET %s
+LIMIT %s;
@@ -0,0 +1,16 @@
+SELECT t.id, t.title, t.summary, t.summarized_through_id, t.turn_count,
+       COALESCE(w.turns, '[]'::json) AS turns
+FROM ai_conversation_threads t
+LEFT JOIN LATERAL (
+    SELECT json_agg(json_build_object('id', c.id, 'message', c.message, 'response', c.response) ORDER BY c.id) AS turns
+    FROM (
+        SELECT id, message, response
+        FROM ai_conversations
+        WHERE conversation_id = t.id AND id > COALESCE(t.summarized_through_id, 0)
+        ORDER BY id DESC
+        LIMIT %s
+    ) c
+) w ON TRUE
+WHERE t.user_id = %s AND (%s::int IS NULL OR t.id = %s)
+ORDER BY t.updated_at DESC, t.id DESC
+LIMIT 1;
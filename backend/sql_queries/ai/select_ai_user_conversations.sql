@@ -1,4 +1,6 @@
-SELECT id, message, response, created_at
-FROM ai_conversations
-WHERE user_id = %s
-ORDER BY created_at ASC;
\ No newline at end of file
+SELECT c.id, c.conversation_id, c.message, c.response, c.created_at
+FROM ai_conversations c
+JOIN ai_conversation_threads t ON t.id = c.conversation_id
+WHERE t.id = %s AND t.user_id = %s AND (%s::int IS NULL OR c.id < %s)
+ORDER BY c.id DESC
+LIMIT %s;
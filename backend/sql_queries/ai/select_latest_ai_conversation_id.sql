@@ -0,0 +1,5 @@
+SELECT id
+FROM ai_conversation_threads
+WHERE user_id = %s
+ORDER BY updated_at DESC, id DESC
+LIMIT 1;
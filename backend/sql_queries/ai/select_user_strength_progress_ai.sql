@@ -1,13 +1,11 @@
-WITH latest AS (
-    SELECT 
-        e.name,
-        MAX(wst.weight_lb) as current_weight,
-        MAX(wst.reps_completed) as current_reps
-    FROM workout_sets wst
-    JOIN workout_sessions ws ON wst.session_id = ws.id
-    JOIN exercises e ON wst.exercise_id = e.id
-    WHERE ws.user_id = %s
-    GROUP BY e.name
-)
-SELECT * FROM latest
+SELECT e.name,
+       r.best_e1rm_weight_lb AS current_weight,
+       r.best_e1rm_reps AS current_reps,
+       r.best_e1rm_lb AS e1rm,
+       r.best_weight_lb,
+       ROUND((r.last_e1rm_lb - r.first_e1rm_lb) * 100 / NULLIF(r.first_e1rm_lb, 0), 1) AS progress_percent
+FROM user_exercise_records r
+JOIN exercises e ON e.id = r.exercise_id
+WHERE r.user_id = %s
+ORDER BY r.last_session_id DESC, r.best_e1rm_lb DESC
 LIMIT 10
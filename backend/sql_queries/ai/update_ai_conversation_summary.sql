@@ -0,0 +1,4 @@
+UPDATE ai_conversation_threads
+SET summary = %s,
+    summarized_through_id = %s
+WHERE id = %s AND summarized_through_id IS NOT DISTINCT FROM %s;
@@ -0,0 +1,37 @@
+WITH sessions AS (
+    SELECT ws.id, ws.user_id,
+           COALESCE(ws.duration_min, 0) AS duration_min,
+           COALESCE(ws.calories_burned, 0) AS calories_burned,
+           (ws.end_time AT TIME ZONE COALESCE(p.timezone, 'UTC'))::date AS day
+    FROM workout_sessions ws
+    LEFT JOIN profiles p ON p.user_id = ws.user_id
+    WHERE ws.user_id = ANY(%s) AND ws.status = 'completed' AND ws.end_time IS NOT NULL
+),
+by_category AS (
+    SELECT s.user_id, s.day, COALESCE(e.category, 'other') AS category,
+           COUNT(st.id) AS sets,
+           COALESCE(SUM(st.reps_completed), 0) AS reps,
+           COALESCE(SUM(st.reps_completed * st.weight_lb), 0) AS volume_lb
+    FROM sessions s
+    JOIN workout_sets st ON st.session_id = s.id AND NOT st.is_warmup
+    LEFT JOIN exercises e ON e.id = st.exercise_id
+    GROUP BY 1, 2, 3
+),
+set_totals AS (
+    SELECT user_id, day, SUM(sets)::int AS sets, SUM(reps)::int AS reps, SUM(volume_lb) AS volume_lb,
+           jsonb_object_agg(category, volume_lb) AS volume_by_category
+    FROM by_category
+    GROUP BY 1, 2
+),
+session_totals AS (
+    SELECT user_id, day, COUNT(*)::int AS sessions,
+           SUM(duration_min)::int AS duration_min, SUM(calories_burned)::int AS calories_burned
+    FROM sessions
+    GROUP BY 1, 2
+)
+INSERT INTO user_daily_training (user_id, day, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category)
+SELECT st.user_id, st.day, st.sessions,
+       COALESCE(t.sets, 0), COALESCE(t.reps, 0), COALESCE(t.volume_lb, 0),
+       st.duration_min, st.calories_burned, COALESCE(t.volume_by_category, '{}'::jsonb)
+FROM session_totals st
+LEFT JOIN set_totals t ON t.user_id = st.user_id AND t.day = st.day;
@@ -0,0 +1,24 @@
+WITH weeks AS (
+    SELECT user_id, date_trunc('week', day)::date AS week_start,
+           SUM(sessions)::int AS sessions, SUM(sets)::int AS sets, SUM(reps)::int AS reps,
+           SUM(volume_lb) AS volume_lb, SUM(duration_min)::int AS duration_min,
+           SUM(calories_burned)::int AS calories_burned
+    FROM user_daily_training
+    WHERE user_id = ANY(%s)
+    GROUP BY 1, 2
+),
+categories AS (
+    SELECT user_id, week_start, jsonb_object_agg(key, total) AS volume_by_category
+    FROM (
+        SELECT d.user_id, date_trunc('week', d.day)::date AS week_start, kv.key, SUM(kv.value::numeric) AS total
+        FROM user_daily_training d, jsonb_each_text(d.volume_by_category) AS kv
+        WHERE d.user_id = ANY(%s)
+        GROUP BY 1, 2, 3
+    ) AS per_key
+    GROUP BY 1, 2
+)
+INSERT INTO user_weekly_training (user_id, week_start, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category)
+SELECT w.user_id, w.week_start, w.sessions, w.sets, w.reps, w.volume_lb, w.duration_min, w.calories_burned,
+       COALESCE(c.volume_by_category, '{}'::jsonb)
+FROM weeks w
+LEFT JOIN categories c ON c.user_id = w.user_id AND c.week_start = w.week_start;
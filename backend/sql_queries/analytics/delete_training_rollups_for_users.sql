@@ -0,0 +1,4 @@
+WITH daily AS (
+    DELETE FROM user_daily_training WHERE user_id = ANY(%s)
+)
+DELETE FROM user_weekly_training WHERE user_id = ANY(%s);
@@ -0,0 +1,76 @@
+WITH completed_session AS (
+    SELECT ws.id, ws.user_id,
+           COALESCE(ws.duration_min, 0) AS duration_min,
+           COALESCE(ws.calories_burned, 0) AS calories_burned,
+           (ws.end_time AT TIME ZONE COALESCE(p.timezone, 'UTC'))::date AS day
+    FROM workout_sessions ws
+    LEFT JOIN profiles p ON p.user_id = ws.user_id
+    WHERE ws.id = %s AND ws.end_time IS NOT NULL
+),
+by_category AS (
+    SELECT COALESCE(e.category, 'other') AS category,
+           COUNT(st.id) AS sets,
+           COALESCE(SUM(st.reps_completed), 0) AS reps,
+           COALESCE(SUM(st.reps_completed * st.weight_lb), 0) AS volume_lb
+    FROM workout_sets st
+    JOIN completed_session s ON s.id = st.session_id
+    LEFT JOIN exercises e ON e.id = st.exercise_id
+    WHERE NOT st.is_warmup
+    GROUP BY 1
+),
+totals AS (
+    SELECT s.user_id, s.day, date_trunc('week', s.day)::date AS week_start, 1 AS sessions,
+           COALESCE((SELECT SUM(sets) FROM by_category), 0)::int AS sets,
+           COALESCE((SELECT SUM(reps) FROM by_category), 0)::int AS reps,
+           COALESCE((SELECT SUM(volume_lb) FROM by_category), 0) AS volume_lb,
+           s.duration_min, s.calories_burned,
+           COALESCE((SELECT jsonb_object_agg(category, volume_lb) FROM by_category), '{}'::jsonb) AS volume_by_category
+    FROM completed_session s
+),
+daily AS (
+    INSERT INTO user_daily_training AS t (user_id, day, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category)
+    SELECT user_id, day, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category
+    FROM totals
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET sessions = t.sessions + EXCLUDED.sessions,
+        sets = t.sets + EXCLUDED.sets,
+        reps = t.reps + EXCLUDED.reps,
+        volume_lb = t.volume_lb + EXCLUDED.volume_lb,
+        duration_min = t.duration_min + EXCLUDED.duration_min,
+        calories_burned = t.calories_burned + EXCLUDED.calories_burned,
+        volume_by_category = (
+            SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb)
+            FROM (
+                SELECT key, SUM(value::numeric) AS total
+                FROM (
+                    SELECT * FROM jsonb_each_text(t.volume_by_category)
+                    UNION ALL
+                    SELECT * FROM jsonb_each_text(EXCLUDED.volume_by_category)
+                ) AS kv
+                GROUP BY key
+            ) AS merged
+        )
+    RETURNING t.user_id
+)
+INSERT INTO user_weekly_training AS t (user_id, week_start, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category)
+SELECT user_id, week_start, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category
+FROM totals
+ON CONFLICT (user_id, week_start) DO UPDATE
+SET sessions = t.sessions + EXCLUDED.sessions,
+    sets = t.sets + EXCLUDED.sets,
+    reps = t.reps + EXCLUDED.reps,
+    volume_lb = t.volume_lb + EXCLUDED.volume_lb,
+    duration_min = t.duration_min + EXCLUDED.duration_min,
+    calories_burned = t.calories_burned + EXCLUDED.calories_burned,
+    volume_by_category = (
+        SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb)
+        FROM (
+            SELECT key, SUM(value::numeric) AS total
+            FROM (
+                SELECT * FROM jsonb_each_text(t.volume_by_category)
+                UNION ALL
+                SELECT * FROM jsonb_each_text(EXCLUDED.volume_by_category)
+            ) AS kv
+            GROUP BY key
+        ) AS merged
+    );
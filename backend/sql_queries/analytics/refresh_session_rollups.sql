@@ -0,0 +1,93 @@
+WITH sessions AS (
+    SELECT ws.id, ws.user_id,
+           COALESCE(ws.duration_min, 0) AS duration_min,
+           COALESCE(ws.calories_burned, 0) AS calories_burned,
+           (ws.end_time AT TIME ZONE COALESCE(p.timezone, 'UTC'))::date AS day
+    FROM workout_sessions ws
+    LEFT JOIN profiles p ON p.user_id = ws.user_id
+    WHERE ws.user_id = %s AND ws.status = 'completed' AND ws.end_time IS NOT NULL
+),
+days AS (
+    SELECT DISTINCT day FROM sessions WHERE id = ANY(%s)
+),
+day_sessions AS (
+    SELECT s.* FROM sessions s JOIN days d ON d.day = s.day
+),
+by_category AS (
+    SELECT s.user_id, s.day, COALESCE(e.category, 'other') AS category,
+           COUNT(st.id) AS sets,
+           COALESCE(SUM(st.reps_completed), 0) AS reps,
+           COALESCE(SUM(st.reps_completed * st.weight_lb), 0) AS volume_lb
+    FROM day_sessions s
+    JOIN workout_sets st ON st.session_id = s.id AND NOT st.is_warmup
+    LEFT JOIN exercises e ON e.id = st.exercise_id
+    GROUP BY 1, 2, 3
+),
+set_totals AS (
+    SELECT user_id, day, SUM(sets)::int AS sets, SUM(reps)::int AS reps, SUM(volume_lb) AS volume_lb,
+           jsonb_object_agg(category, volume_lb) AS volume_by_category
+    FROM by_category
+    GROUP BY 1, 2
+),
+session_totals AS (
+    SELECT user_id, day, COUNT(*)::int AS sessions,
+           SUM(duration_min)::int AS duration_min, SUM(calories_burned)::int AS calories_burned
+    FROM day_sessions
+    GROUP BY 1, 2
+),
+daily AS (
+    INSERT INTO user_daily_training AS t (user_id, day, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category)
+    SELECT st.user_id, st.day, st.sessions,
+           COALESCE(tot.sets, 0), COALESCE(tot.reps, 0), COALESCE(tot.volume_lb, 0),
+           st.duration_min, st.calories_burned, COALESCE(tot.volume_by_category, '{}'::jsonb)
+    FROM session_totals st
+    LEFT JOIN set_totals tot ON tot.user_id = st.user_id AND tot.day = st.day
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET sessions = EXCLUDED.sessions,
+        sets = EXCLUDED.sets,
+        reps = EXCLUDED.reps,
+        volume_lb = EXCLUDED.volume_lb,
+        duration_min = EXCLUDED.duration_min,
+        calories_burned = EXCLUDED.calories_burned,
+        volume_by_category = EXCLUDED.volume_by_category
+    RETURNING t.user_id, t.day, t.sessions, t.sets, t.reps, t.volume_lb, t.duration_min, t.calories_burned, t.volume_by_category
+),
+week_days AS (
+    SELECT * FROM daily
+    UNION ALL
+    SELECT d.user_id, d.day, d.sessions, d.sets, d.reps, d.volume_lb, d.duration_min, d.calories_burned, d.volume_by_category
+    FROM user_daily_training d
+    WHERE d.user_id = %s
+      AND date_trunc('week', d.day)::date IN (SELECT date_trunc('week', day)::date FROM days)
+      AND d.day NOT IN (SELECT day FROM days)
+),
+weeks AS (
+    SELECT user_id, date_trunc('week', day)::date AS week_start,
+           SUM(sessions)::int AS sessions, SUM(sets)::int AS sets, SUM(reps)::int AS reps,
+           SUM(volume_lb) AS volume_lb, SUM(duration_min)::int AS duration_min,
+           SUM(calories_burned)::int AS calories_burned
+    FROM week_days
+    GROUP BY 1, 2
+),
+categories AS (
+    SELECT user_id, week_start, jsonb_object_agg(key, total) AS volume_by_category
+    FROM (
+        SELECT wd.user_id, date_trunc('week', wd.day)::date AS week_start, kv.key, SUM(kv.value::numeric) AS total
+        FROM week_days wd, jsonb_each_text(wd.volume_by_category) AS kv
+        GROUP BY 1, 2, 3
+    ) AS per_key
+    GROUP BY 1, 2
+)
+INSERT INTO user_weekly_training AS t (user_id, week_start, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category)
+SELECT w.user_id, w.week_start, w.sessions, w.sets, w.reps, w.volume_lb, w.duration_min, w.calories_burned,
+       COALESCE(c.volume_by_category, '{}'::jsonb)
+FROM weeks w
+LEFT JOIN categories c ON c.user_id = w.user_id AND c.week_start = w.week_start
+ON CONFLICT (user_id, week_start) DO UPDATE
+SET sessions = EXCLUDED.sessions,
+    sets = EXCLUDED.sets,
+    reps = EXCLUDED.reps,
+    volume_lb = EXCLUDED.volume_lb,
+    duration_min = EXCLUDED.duration_min,
+    calories_burned = EXCLUDED.calories_burned,
+    volume_by_category = EXCLUDED.volume_by_category;
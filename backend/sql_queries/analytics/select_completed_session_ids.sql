@@ -0,0 +1,3 @@
+SELECT id
+FROM workout_sessions
+WHERE id = ANY(%s) AND user_id = %s AND status = 'completed';
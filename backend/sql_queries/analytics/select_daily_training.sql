@@ -0,0 +1,4 @@
+SELECT day, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category
+FROM user_daily_training
+WHERE user_id = %s AND day BETWEEN %s AND %s
+ORDER BY day;
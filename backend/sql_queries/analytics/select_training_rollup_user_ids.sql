@@ -0,0 +1,5 @@
+SELECT DISTINCT user_id
+FROM workout_sessions
+WHERE status = 'completed' AND user_id > %s
+ORDER BY user_id
+LIMIT %s;
@@ -0,0 +1,21 @@
+WITH days AS (
+    SELECT *
+    FROM user_daily_training
+    WHERE user_id = %s AND day BETWEEN %s AND %s
+)
+SELECT COUNT(*)::int AS active_days,
+       COALESCE(SUM(sessions), 0)::int AS sessions,
+       COALESCE(SUM(sets), 0)::int AS sets,
+       COALESCE(SUM(reps), 0)::int AS reps,
+       COALESCE(SUM(volume_lb), 0) AS volume_lb,
+       COALESCE(SUM(duration_min), 0)::int AS duration_min,
+       COALESCE(SUM(calories_burned), 0)::int AS calories_burned,
+       COALESCE((
+           SELECT jsonb_object_agg(key, total)
+           FROM (
+               SELECT kv.key, SUM(kv.value::numeric) AS total
+               FROM days, jsonb_each_text(days.volume_by_category) AS kv
+               GROUP BY kv.key
+           ) AS per_key
+       ), '{}'::jsonb) AS volume_by_category
+FROM days;
@@ -0,0 +1,3 @@
+SELECT (NOW() AT TIME ZONE COALESCE(
+    (SELECT timezone FROM public.profiles WHERE user_id = %s), 'UTC'
+))::date AS today;
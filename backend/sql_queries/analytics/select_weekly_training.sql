@@ -0,0 +1,4 @@
+SELECT week_start, sessions, sets, reps, volume_lb, duration_min, calories_burned, volume_by_category
+FROM user_weekly_training
+WHERE user_id = %s AND week_start BETWEEN %s AND %s
+ORDER BY week_start;
@@ -0,0 +1,10 @@
+UPDATE public.challenges c
+SET current_progress = LEAST(c.goal, GREATEST(0, c.current_progress + v.delta)),
+    is_completed = c.current_progress + v.delta >= c.goal,
+    last_updated = NOW()
+FROM unnest(%s::varchar[], %s::numeric[]) AS v(challenge_title, delta)
+WHERE c.user_id = %s
+  AND c.challenge_title = v.challenge_title
+  AND NOT c.is_completed
+  AND (c.challenge_type, c.period_key) IN (('Daily', %s), ('Weekly', %s), ('All-Time', 'all-time'))
+RETURNING c.id, c.challenge_type, c.challenge_title, c.current_progress, c.is_completed;
@@ -1 +0,0 @@
-SELECT 1 FROM public.challenges WHERE user_id = %s AND challenge_type = 'All-Time' LIMIT 1;
\ No newline at end of file
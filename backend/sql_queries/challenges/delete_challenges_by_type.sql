@@ -1 +0,0 @@
-DELETE FROM public.challenges WHERE user_id = %s AND challenge_type = %s;
\ No newline at end of file
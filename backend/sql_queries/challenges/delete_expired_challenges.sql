@@ -0,0 +1,2 @@
+DELETE FROM public.challenges
+WHERE user_id = %s AND challenge_type = %s AND period_key < %s;
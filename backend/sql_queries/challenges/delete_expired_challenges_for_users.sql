@@ -0,0 +1,4 @@
+DELETE FROM public.challenges
+WHERE user_id = ANY(%s)
+  AND ((challenge_type = 'Daily' AND period_key < %s)
+    OR (challenge_type = 'Weekly' AND period_key < %s));
@@ -0,0 +1,18 @@
+WITH target AS (
+    SELECT id, is_completed, challenge_title = ANY(%s::text[]) AS auto_tracked
+    FROM public.challenges
+    WHERE id = %s AND user_id = %s
+    FOR UPDATE
+),
+updated AS (
+    UPDATE public.challenges c
+    SET current_progress = LEAST(c.goal, c.current_progress + %s),
+        is_completed = c.current_progress + %s >= c.goal,
+        last_updated = NOW()
+    FROM target t
+    WHERE c.id = t.id AND NOT t.is_completed AND NOT t.auto_tracked
+    RETURNING c.id, c.user_id, c.challenge_type, c.challenge_title, c.goal, c.current_progress, c.is_completed, c.period_key, c.assigned_at, c.last_updated
+)
+SELECT u.*, t.is_completed AS was_completed, t.auto_tracked, (u.is_completed AND NOT t.is_completed) AS just_completed
+FROM target t
+LEFT JOIN updated u ON u.id = t.id;
@@ -0,0 +1,26 @@
+WITH v AS (
+    SELECT *
+    FROM unnest(%s::int[], %s::numeric[]) AS v(id, increment)
+),
+target AS (
+    SELECT c.id, c.is_completed, c.challenge_title = ANY(%s::text[]) AS auto_tracked
+    FROM public.challenges c
+    JOIN v ON v.id = c.id
+    WHERE c.user_id = %s
+    ORDER BY c.id
+    FOR UPDATE OF c
+),
+updated AS (
+    UPDATE public.challenges c
+    SET current_progress = LEAST(c.goal, c.current_progress + v.increment),
+        is_completed = c.current_progress + v.increment >= c.goal,
+        last_updated = NOW()
+    FROM target t
+    JOIN v ON v.id = t.id
+    WHERE c.id = t.id AND NOT t.is_completed AND NOT t.auto_tracked
+    RETURNING c.id, c.challenge_type, c.challenge_title, c.is_completed
+)
+SELECT t.id, u.challenge_type, u.challenge_title, t.is_completed AS was_completed, t.auto_tracked,
+       COALESCE(u.is_completed AND NOT t.is_completed, FALSE) AS just_completed
+FROM target t
+LEFT JOIN updated u ON u.id = t.id;
@@ -0,0 +1,15 @@
+INSERT INTO public.challenges (
+        user_id,
+        challenge_type,
+        challenge_title,
+        goal,
+        current_progress,
+        is_completed,
+        period_key,
+        assigned_at,
+        last_updated
+    )
+SELECT %s, v.challenge_type, v.challenge_title, v.goal, v.current_progress, v.current_progress >= v.goal, v.period_key, %s, %s
+FROM unnest(%s::varchar[], %s::varchar[], %s::numeric[], %s::numeric[], %s::varchar[])
+    AS v(challenge_type, challenge_title, goal, current_progress, period_key)
+RETURNING id, user_id, challenge_type, challenge_title, goal, current_progress, is_completed, period_key, assigned_at, last_updated;
@@ -0,0 +1,20 @@
+INSERT INTO public.challenges (
+        user_id,
+        challenge_type,
+        challenge_title,
+        goal,
+        current_progress,
+        is_completed,
+        period_key,
+        assigned_at,
+        last_updated
+    )
+SELECT v.user_id, v.challenge_type, v.challenge_title, v.goal, v.current_progress, v.current_progress >= v.goal, v.period_key, %s, %s
+FROM unnest(%s::int[], %s::varchar[], %s::varchar[], %s::numeric[], %s::numeric[], %s::varchar[])
+    AS v(user_id, challenge_type, challenge_title, goal, current_progress, period_key)
+WHERE NOT EXISTS (
+    SELECT 1 FROM public.challenges c
+    WHERE c.user_id = v.user_id
+      AND c.challenge_type = v.challenge_type
+      AND c.period_key = v.period_key
+);
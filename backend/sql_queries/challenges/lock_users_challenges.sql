@@ -0,0 +1,2 @@
+SELECT pg_advisory_xact_lock(%s, ids.user_id)
+FROM (SELECT user_id FROM unnest(%s::int[]) AS user_id ORDER BY user_id) AS ids;
@@ -0,0 +1,15 @@
+SELECT u.id
+FROM public.users u
+WHERE u.id > %s
+  AND (
+    EXISTS (
+        SELECT 1 FROM public.challenges c
+        WHERE c.user_id = u.id AND c.last_updated >= NOW() - make_interval(days => %s)
+    )
+    OR EXISTS (
+        SELECT 1 FROM workout_sessions ws
+        WHERE ws.user_id = u.id AND ws.start_time >= NOW() - make_interval(days => %s)
+    )
+  )
+ORDER BY u.id
+LIMIT %s;
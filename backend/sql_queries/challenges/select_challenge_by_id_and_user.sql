@@ -1 +0,0 @@
-SELECT current_progress, goal, is_completed FROM public.challenges WHERE id = %s AND user_id = %s FOR UPDATE;
\ No newline at end of file
@@ -1 +0,0 @@
-SELECT challenge_type FROM public.challenges WHERE id = %s;
\ No newline at end of file
@@ -0,0 +1,4 @@
+SELECT DISTINCT challenge_type
+FROM public.challenges
+WHERE user_id = %s
+  AND (challenge_type, period_key) IN (('Daily', %s), ('Weekly', %s), ('All-Time', 'all-time'));
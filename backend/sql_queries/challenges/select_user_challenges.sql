@@ -6,7 +6,9 @@ SELECT
     goal, 
     current_progress, 
     is_completed, 
+    period_key,
     assigned_at,
     last_updated
 FROM public.challenges
-WHERE user_id = %s;
\ No newline at end of file
+WHERE user_id = %s
+  AND (challenge_type, period_key) IN (('Daily', %s), ('Weekly', %s), ('All-Time', 'all-time'));
@@ -1,6 +1,14 @@
-UPDATE public.challenges
-SET current_progress = %s, 
-    is_completed = CASE WHEN goal <= %s THEN TRUE ELSE FALSE END,
+UPDATE public.challenges jm
+SET current_progress = done.completed_count,
+    is_completed = jm.goal <= done.completed_count,
     last_updated = NOW()
-WHERE user_id = %s AND challenge_title = 'Journey Master'
-RETURNING id, user_id, challenge_type, challenge_title, goal, current_progress, is_completed, assigned_at, last_updated;
\ No newline at end of file
+FROM (
+    SELECT COUNT(id) AS completed_count
+    FROM public.challenges
+    WHERE user_id = %s
+      AND challenge_type = 'All-Time'
+      AND is_completed = TRUE
+      AND challenge_title != 'Journey Master'
+) AS done
+WHERE jm.user_id = %s AND jm.challenge_title = 'Journey Master' AND NOT jm.is_completed
+RETURNING jm.id, jm.user_id, jm.challenge_type, jm.challenge_title, jm.goal, jm.current_progress, jm.is_completed, jm.assigned_at, jm.last_updated;
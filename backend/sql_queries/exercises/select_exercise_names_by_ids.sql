@@ -0,0 +1,3 @@
+SELECT id, name, category
+FROM exercises
+WHERE id = ANY(%s);
@@ -0,0 +1,3 @@
+SELECT COUNT(*) + 1 AS rank
+FROM leaderboard
+WHERE total_points > %s;
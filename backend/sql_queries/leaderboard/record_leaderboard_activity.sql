@@ -0,0 +1,9 @@
+INSERT INTO leaderboard (user_id, total_points, workouts_completed, challenges_completed, total_calories_burned, last_updated)
+VALUES (%s, %s, %s, %s, %s, NOW())
+ON CONFLICT (user_id) DO UPDATE
+SET total_points = leaderboard.total_points + EXCLUDED.total_points,
+    workouts_completed = COALESCE(leaderboard.workouts_completed, 0) + EXCLUDED.workouts_completed,
+    challenges_completed = COALESCE(leaderboard.challenges_completed, 0) + EXCLUDED.challenges_completed,
+    total_calories_burned = COALESCE(leaderboard.total_calories_burned, 0) + EXCLUDED.total_calories_burned,
+    last_updated = NOW()
+RETURNING user_id, total_points, workouts_completed, challenges_completed, current_streak_days, longest_streak_days, total_calories_burned, rank, last_updated;
@@ -0,0 +1,8 @@
+UPDATE leaderboard l
+SET rank = ranked.rank
+FROM (
+    SELECT user_id, RANK() OVER (ORDER BY total_points DESC)::int AS rank
+    FROM leaderboard
+) AS ranked
+WHERE l.user_id = ranked.user_id
+  AND l.rank IS DISTINCT FROM ranked.rank;
@@ -0,0 +1,10 @@
+WITH zones AS MATERIALIZED (
+    SELECT name FROM pg_timezone_names
+)
+UPDATE leaderboard l
+SET current_streak_days = 0
+WHERE l.current_streak_days > 0
+  AND l.last_active_date < (NOW() AT TIME ZONE 'UTC')::date
+  AND l.last_active_date < (NOW() AT TIME ZONE COALESCE(
+      (SELECT p.timezone FROM profiles p JOIN zones z ON z.name = p.timezone WHERE p.user_id = l.user_id), 'UTC'
+  ))::date - 1;
@@ -0,0 +1,6 @@
+SELECT l.user_id, u.username, l.total_points, l.workouts_completed, l.challenges_completed,
+       l.current_streak_days, l.longest_streak_days, l.total_calories_burned, l.rank
+FROM leaderboard l
+JOIN users u ON u.id = l.user_id
+ORDER BY l.total_points DESC, l.user_id DESC
+LIMIT %s;
@@ -0,0 +1,22 @@
+WITH local_day AS (
+    SELECT (NOW() AT TIME ZONE COALESCE(
+        (SELECT timezone FROM profiles WHERE user_id = %s), 'UTC'
+    ))::date AS today
+),
+next_streak AS (
+    SELECT l.user_id, d.today,
+           CASE
+               WHEN l.last_active_date >= d.today THEN COALESCE(l.current_streak_days, 0)
+               WHEN l.last_active_date = d.today - 1 THEN COALESCE(l.current_streak_days, 0) + 1
+               ELSE 1
+           END AS current_streak_days
+    FROM leaderboard l, local_day d
+    WHERE l.user_id = %s
+)
+UPDATE leaderboard l
+SET current_streak_days = n.current_streak_days,
+    longest_streak_days = GREATEST(COALESCE(l.longest_streak_days, 0), n.current_streak_days),
+    last_active_date = GREATEST(l.last_active_date, n.today)
+FROM next_streak n
+WHERE l.user_id = n.user_id
+RETURNING l.current_streak_days, l.longest_streak_days, l.last_active_date;
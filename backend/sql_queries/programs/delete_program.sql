@@ -1,3 +1,3 @@
 DELETE FROM programs
-WHERE id = %s
+WHERE id = %s AND user_id = %s
 RETURNING id;
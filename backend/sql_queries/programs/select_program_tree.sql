@@ -0,0 +1,30 @@
+SELECT p.id, p.user_id, p.name, p.description, p.is_active, p.created_at, p.updated_at,
+    COALESCE((
+        SELECT json_agg(json_build_object(
+            'id', wt.id,
+            'program_id', wt.program_id,
+            'name', wt.name,
+            'day_order', wt.day_order,
+            'notes', wt.notes,
+            'created_at', wt.created_at,
+            'exercises', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', te.id,
+                    'exercise_id', te.exercise_id,
+                    'exercise_name', e.name,
+                    'target_sets', te.target_sets,
+                    'target_reps', te.target_reps,
+                    'target_weight_lb', te.target_weight_lb,
+                    'rest_seconds', te.rest_seconds,
+                    'order_index', te.order_index
+                ) ORDER BY te.order_index)
+                FROM template_exercises te
+                JOIN exercises e ON te.exercise_id = e.id
+                WHERE te.template_id = wt.id
+            ), '[]'::json)
+        ) ORDER BY wt.day_order)
+        FROM workout_templates wt
+        WHERE wt.program_id = p.id
+    ), '[]'::json) AS templates
+FROM programs p
+WHERE p.id = %s AND p.user_id = %s;
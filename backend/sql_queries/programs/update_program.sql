@@ -1,4 +1,7 @@
 UPDATE programs
-SET name = %s, description = %s, is_active = %s, updated_at = NOW()
-WHERE id = %s
+SET name = %s,
+    description = COALESCE(%s, description),
+    is_active = COALESCE(%s, is_active),
+    updated_at = NOW()
+WHERE id = %s AND user_id = %s
 RETURNING id, user_id, name, description, is_active, created_at, updated_at;
@@ -0,0 +1,2 @@
+DELETE FROM user_exercise_records
+WHERE user_id = ANY(%s) AND (%s::int[] IS NULL OR exercise_id = ANY(%s));
@@ -0,0 +1,44 @@
+WITH input AS (
+    SELECT ws.user_id, st.exercise_id, st.session_id, st.weight_lb, st.reps_completed AS reps,
+           ROUND(CASE WHEN st.reps_completed = 1 THEN st.weight_lb
+                      ELSE st.weight_lb * (1 + st.reps_completed / 30.0) END, 1) AS e1rm
+    FROM workout_sets st
+    JOIN workout_sessions ws ON ws.id = st.session_id
+    WHERE ws.user_id = ANY(%s) AND (%s::int[] IS NULL OR st.exercise_id = ANY(%s))
+      AND NOT st.is_warmup AND st.weight_lb > 0 AND st.reps_completed > 0
+),
+best_e1rm AS (
+    SELECT DISTINCT ON (user_id, exercise_id) user_id, exercise_id, session_id, weight_lb, reps, e1rm
+    FROM input
+    ORDER BY user_id, exercise_id, e1rm DESC, session_id
+),
+best_weight AS (
+    SELECT DISTINCT ON (user_id, exercise_id) user_id, exercise_id, weight_lb, reps
+    FROM input
+    ORDER BY user_id, exercise_id, weight_lb DESC, reps DESC
+),
+sessions AS (
+    SELECT user_id, exercise_id, session_id, MAX(e1rm) AS e1rm,
+           ROW_NUMBER() OVER (PARTITION BY user_id, exercise_id ORDER BY session_id) AS first_rank,
+           ROW_NUMBER() OVER (PARTITION BY user_id, exercise_id ORDER BY session_id DESC) AS last_rank
+    FROM input
+    GROUP BY user_id, exercise_id, session_id
+),
+counts AS (
+    SELECT user_id, exercise_id, COUNT(*)::int AS set_count
+    FROM input
+    GROUP BY user_id, exercise_id
+)
+INSERT INTO user_exercise_records (
+    user_id, exercise_id, best_weight_lb, best_weight_reps,
+    best_e1rm_lb, best_e1rm_weight_lb, best_e1rm_reps, best_e1rm_session_id,
+    first_e1rm_lb, first_session_id, last_e1rm_lb, last_session_id, set_count
+)
+SELECT be.user_id, be.exercise_id, bw.weight_lb, bw.reps,
+       be.e1rm, be.weight_lb, be.reps, be.session_id,
+       f.e1rm, f.session_id, l.e1rm, l.session_id, c.set_count
+FROM best_e1rm be
+JOIN best_weight bw ON bw.user_id = be.user_id AND bw.exercise_id = be.exercise_id
+JOIN sessions f ON f.user_id = be.user_id AND f.exercise_id = be.exercise_id AND f.first_rank = 1
+JOIN sessions l ON l.user_id = be.user_id AND l.exercise_id = be.exercise_id AND l.last_rank = 1
+JOIN counts c ON c.user_id = be.user_id AND c.exercise_id = be.exercise_id;
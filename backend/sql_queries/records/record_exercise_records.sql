@@ -0,0 +1,75 @@
+WITH input AS (
+    SELECT exercise_id, session_id, weight_lb, reps, counted,
+           ROUND(CASE WHEN reps = 1 THEN weight_lb ELSE weight_lb * (1 + reps / 30.0) END, 1) AS e1rm
+    FROM unnest(%s::int[], %s::int[], %s::numeric[], %s::int[], %s::int[])
+         AS t(exercise_id, session_id, weight_lb, reps, counted)
+    WHERE weight_lb > 0 AND reps > 0
+),
+best_e1rm AS (
+    SELECT DISTINCT ON (exercise_id) exercise_id, session_id, weight_lb, reps, e1rm
+    FROM input
+    ORDER BY exercise_id, e1rm DESC, session_id
+),
+best_weight AS (
+    SELECT DISTINCT ON (exercise_id) exercise_id, weight_lb, reps
+    FROM input
+    ORDER BY exercise_id, weight_lb DESC, reps DESC
+),
+sessions AS (
+    SELECT exercise_id, session_id, MAX(e1rm) AS e1rm,
+           ROW_NUMBER() OVER (PARTITION BY exercise_id ORDER BY session_id) AS first_rank,
+           ROW_NUMBER() OVER (PARTITION BY exercise_id ORDER BY session_id DESC) AS last_rank
+    FROM input
+    GROUP BY exercise_id, session_id
+),
+counts AS (
+    SELECT exercise_id, SUM(counted)::int AS set_count
+    FROM input
+    GROUP BY exercise_id
+),
+upserted AS (
+    INSERT INTO user_exercise_records AS r (
+        user_id, exercise_id, best_weight_lb, best_weight_reps,
+        best_e1rm_lb, best_e1rm_weight_lb, best_e1rm_reps, best_e1rm_session_id,
+        first_e1rm_lb, first_session_id, last_e1rm_lb, last_session_id, set_count
+    )
+    SELECT %s, be.exercise_id, bw.weight_lb, bw.reps,
+           be.e1rm, be.weight_lb, be.reps, be.session_id,
+           f.e1rm, f.session_id, l.e1rm, l.session_id, c.set_count
+    FROM best_e1rm be
+    JOIN best_weight bw ON bw.exercise_id = be.exercise_id
+    JOIN sessions f ON f.exercise_id = be.exercise_id AND f.first_rank = 1
+    JOIN sessions l ON l.exercise_id = be.exercise_id AND l.last_rank = 1
+    JOIN counts c ON c.exercise_id = be.exercise_id
+    ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+        best_weight_lb = GREATEST(r.best_weight_lb, EXCLUDED.best_weight_lb),
+        best_weight_reps = CASE
+            WHEN EXCLUDED.best_weight_lb > r.best_weight_lb THEN EXCLUDED.best_weight_reps
+            WHEN EXCLUDED.best_weight_lb = r.best_weight_lb THEN GREATEST(r.best_weight_reps, EXCLUDED.best_weight_reps)
+            ELSE r.best_weight_reps END,
+        best_e1rm_lb = GREATEST(r.best_e1rm_lb, EXCLUDED.best_e1rm_lb),
+        best_e1rm_weight_lb = CASE WHEN EXCLUDED.best_e1rm_lb > r.best_e1rm_lb
+            THEN EXCLUDED.best_e1rm_weight_lb ELSE r.best_e1rm_weight_lb END,
+        best_e1rm_reps = CASE WHEN EXCLUDED.best_e1rm_lb > r.best_e1rm_lb
+            THEN EXCLUDED.best_e1rm_reps ELSE r.best_e1rm_reps END,
+        best_e1rm_session_id = CASE WHEN EXCLUDED.best_e1rm_lb > r.best_e1rm_lb
+            THEN EXCLUDED.best_e1rm_session_id ELSE r.best_e1rm_session_id END,
+        first_e1rm_lb = CASE
+            WHEN EXCLUDED.first_session_id < r.first_session_id THEN EXCLUDED.first_e1rm_lb
+            WHEN EXCLUDED.first_session_id = r.first_session_id THEN GREATEST(r.first_e1rm_lb, EXCLUDED.first_e1rm_lb)
+            ELSE r.first_e1rm_lb END,
+        first_session_id = LEAST(r.first_session_id, EXCLUDED.first_session_id),
+        last_e1rm_lb = CASE
+            WHEN EXCLUDED.last_session_id > r.last_session_id THEN EXCLUDED.last_e1rm_lb
+            WHEN EXCLUDED.last_session_id = r.last_session_id THEN GREATEST(r.last_e1rm_lb, EXCLUDED.last_e1rm_lb)
+            ELSE r.last_e1rm_lb END,
+        last_session_id = GREATEST(r.last_session_id, EXCLUDED.last_session_id),
+        set_count = r.set_count + EXCLUDED.set_count,
+        updated_at = now()
+    RETURNING r.user_id, r.exercise_id, r.best_weight_lb, r.best_e1rm_lb
+)
+SELECT u.exercise_id, u.best_weight_lb, u.best_e1rm_lb,
+       old.best_weight_lb AS previous_best_weight_lb,
+       old.best_e1rm_lb AS previous_best_e1rm_lb
+FROM upserted u
+LEFT JOIN user_exercise_records old ON old.user_id = u.user_id AND old.exercise_id = u.exercise_id;
@@ -0,0 +1,10 @@
+SELECT r.exercise_id, e.name AS exercise_name, e.category,
+       r.best_weight_lb, r.best_weight_reps,
+       r.best_e1rm_lb, r.best_e1rm_weight_lb, r.best_e1rm_reps, r.best_e1rm_session_id,
+       r.first_e1rm_lb, r.last_e1rm_lb,
+       ROUND((r.last_e1rm_lb - r.first_e1rm_lb) * 100 / NULLIF(r.first_e1rm_lb, 0), 1) AS progress_percent,
+       r.set_count, r.updated_at
+FROM user_exercise_records r
+JOIN exercises e ON e.id = r.exercise_id
+WHERE r.user_id = %s AND (%s::int IS NULL OR r.exercise_id = %s)
+ORDER BY r.best_e1rm_lb DESC, r.exercise_id;
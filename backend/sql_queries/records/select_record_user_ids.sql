@@ -0,0 +1,5 @@
+SELECT DISTINCT user_id
+FROM workout_sessions
+WHERE user_id > %s
+ORDER BY user_id
+LIMIT %s;
@@ -0,0 +1,35 @@
+WITH target AS (
+    SELECT id, start_time, status
+    FROM workout_sessions
+    WHERE id = %s AND user_id = %s
+    FOR UPDATE
+),
+stats AS (
+    SELECT COALESCE(SUM(ws.reps_completed * ws.weight_lb), 0) AS total_volume_lb,
+           GREATEST(FLOOR(EXTRACT(EPOCH FROM (NOW() - t.start_time)) / 60), 0)::int AS duration_min
+    FROM target t
+    LEFT JOIN workout_sets ws ON ws.session_id = t.id AND ws.is_warmup = false
+    WHERE t.status IS DISTINCT FROM 'completed'
+    GROUP BY t.start_time
+),
+completed AS (
+    UPDATE workout_sessions s
+    SET end_time = NOW(),
+        status = 'completed',
+        duration_min = st.duration_min,
+        total_volume_lb = st.total_volume_lb,
+        calories_burned = TRUNC(st.total_volume_lb / 1000 * 5 + st.duration_min * 3)::int,
+        notes = %s
+    FROM target t, stats st
+    WHERE s.id = t.id
+    RETURNING s.id, s.user_id, s.start_time, s.end_time, s.status, s.duration_min,
+              s.total_volume_lb, s.calories_burned, s.notes
+)
+SELECT c.*, true AS just_completed
+FROM completed c
+UNION ALL
+SELECT s.id, s.user_id, s.start_time, s.end_time, s.status, s.duration_min,
+       s.total_volume_lb, s.calories_burned, s.notes, false AS just_completed
+FROM workout_sessions s
+JOIN target t ON t.id = s.id
+WHERE t.status = 'completed';
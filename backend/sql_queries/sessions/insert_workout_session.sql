@@ -1,3 +1,6 @@
 INSERT INTO workout_sessions (user_id, template_id, start_time, status, notes)
-VALUES (%s, %s, NOW(), 'in_progress', %s)
+SELECT p.user_id, wt.id, NOW(), 'in_progress', %s
+FROM workout_templates wt
+JOIN programs p ON p.id = wt.program_id
+WHERE wt.id = %s AND p.user_id = %s
 RETURNING id, user_id, template_id, start_time, end_time, status, duration_min, calories_burned, total_volume_lb, notes;
@@ -1,3 +0,0 @@
-SELECT start_time 
-FROM workout_sessions 
-WHERE id = %s;
@@ -0,0 +1,7 @@
+INSERT INTO workout_sets (session_id, exercise_id, set_number)
+SELECT %s, te.exercise_id, gs.set_number
+FROM template_exercises te
+CROSS JOIN LATERAL generate_series(1, te.target_sets) AS gs(set_number)
+WHERE te.template_id = %s
+ORDER BY te.order_index, te.id, gs.set_number
+RETURNING id, session_id, exercise_id, set_number, reps_completed, weight_lb, rpe, is_warmup, created_at;
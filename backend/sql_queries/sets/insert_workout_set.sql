@@ -1,3 +1,5 @@
 INSERT INTO workout_sets (session_id, exercise_id, set_number, reps_completed, weight_lb, rpe, is_warmup)
-VALUES (%s, %s, %s, %s, %s, %s, %s)
+SELECT ws.id, %s, %s, %s, %s, %s, %s
+FROM workout_sessions ws
+WHERE ws.id = %s AND ws.user_id = %s
 RETURNING id, session_id, exercise_id, set_number, reps_completed, weight_lb, rpe, is_warmup, created_at;
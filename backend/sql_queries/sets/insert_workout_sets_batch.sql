@@ -0,0 +1,15 @@
+WITH v AS (
+    SELECT nextval(pg_get_serial_sequence('workout_sets', 'id')) AS id, u.*
+    FROM unnest(%s::int[], %s::int[], %s::int[], %s::numeric[], %s::numeric[], %s::boolean[])
+        WITH ORDINALITY AS u(exercise_id, set_number, reps_completed, weight_lb, rpe, is_warmup, ord)
+),
+inserted AS (
+    INSERT INTO workout_sets (id, session_id, exercise_id, set_number, reps_completed, weight_lb, rpe, is_warmup)
+    SELECT v.id, %s, v.exercise_id, v.set_number, v.reps_completed, v.weight_lb, v.rpe, COALESCE(v.is_warmup, FALSE)
+    FROM v
+    RETURNING id, session_id, exercise_id, set_number, reps_completed, weight_lb, rpe, is_warmup, created_at
+)
+SELECT v.ord, i.*
+FROM inserted i
+JOIN v ON v.id = i.id
+ORDER BY v.ord;
@@ -1,7 +1,8 @@
-UPDATE workout_sets
-SET reps_completed = COALESCE(%s, reps_completed),
-    weight_lb = COALESCE(%s, weight_lb),
-    rpe = COALESCE(%s, rpe)
-WHERE id = %s
-RETURNING id, session_id, exercise_id, set_number, reps_completed, weight_lb, rpe, is_warmup, created_at;
-
+UPDATE workout_sets s
+SET reps_completed = COALESCE(%s, s.reps_completed),
+    weight_lb = COALESCE(%s, s.weight_lb),
+    rpe = COALESCE(%s, s.rpe)
+FROM workout_sessions ws, workout_sets prev
+WHERE s.id = %s AND ws.id = s.session_id AND ws.user_id = %s AND prev.id = s.id
+RETURNING s.id, s.session_id, s.exercise_id, s.set_number, s.reps_completed, s.weight_lb, s.rpe, s.is_warmup, s.created_at,
+          prev.reps_completed AS previous_reps_completed, prev.weight_lb AS previous_weight_lb;
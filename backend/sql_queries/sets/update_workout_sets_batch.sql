@@ -0,0 +1,9 @@
+UPDATE workout_sets ws
+SET reps_completed = COALESCE(v.reps_completed, ws.reps_completed),
+    weight_lb = COALESCE(v.weight_lb, ws.weight_lb),
+    rpe = COALESCE(v.rpe, ws.rpe)
+FROM unnest(%s::int[], %s::int[], %s::numeric[], %s::numeric[]) AS v(id, reps_completed, weight_lb, rpe),
+     workout_sets prev
+WHERE ws.id = v.id AND ws.session_id = %s AND prev.id = ws.id
+RETURNING ws.id, ws.session_id, ws.exercise_id, ws.set_number, ws.reps_completed, ws.weight_lb, ws.rpe, ws.is_warmup, ws.created_at,
+          prev.reps_completed AS previous_reps_completed, prev.weight_lb AS previous_weight_lb;
@@ -1,3 +1,5 @@
-DELETE FROM template_exercises
-WHERE id = %s
-RETURNING id;
+DELETE FROM template_exercises te
+USING workout_templates wt, programs p
+WHERE te.id = %s AND te.template_id = %s
+  AND wt.id = te.template_id AND p.id = wt.program_id AND p.user_id = %s
+RETURNING te.id;
@@ -1,3 +1,4 @@
-DELETE FROM workout_templates
-WHERE id = %s
-RETURNING id;
+DELETE FROM workout_templates wt
+USING programs p
+WHERE wt.id = %s AND p.id = wt.program_id AND p.user_id = %s
+RETURNING wt.id;
@@ -1,3 +1,6 @@
 INSERT INTO template_exercises (template_id, exercise_id, target_sets, target_reps, target_weight_lb, rest_seconds, order_index)
-VALUES (%s, %s, %s, %s, %s, %s, %s)
+SELECT wt.id, %s, %s, %s, %s, %s, %s
+FROM workout_templates wt
+JOIN programs p ON p.id = wt.program_id
+WHERE wt.id = %s AND p.user_id = %s
 RETURNING id, template_id, exercise_id, target_sets, target_reps, target_weight_lb, rest_seconds, order_index;
@@ -1,3 +1,5 @@
 INSERT INTO workout_templates (program_id, name, day_order, notes)
-VALUES (%s, %s, %s, %s)
+SELECT p.id, %s, %s, %s
+FROM programs p
+WHERE p.id = %s AND p.user_id = %s
 RETURNING id, program_id, name, day_order, notes, created_at;
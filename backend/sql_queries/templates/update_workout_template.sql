@@ -1,4 +1,7 @@
-UPDATE workout_templates
-SET name = %s, notes = %s, day_order = %s
-WHERE id = %s
-RETURNING id, program_id, name, day_order, notes, created_at;
+UPDATE workout_templates wt
+SET name = %s,
+    notes = COALESCE(%s, wt.notes),
+    day_order = COALESCE(%s, wt.day_order)
+FROM programs p
+WHERE wt.id = %s AND p.id = wt.program_id AND p.user_id = %s
+RETURNING wt.id, wt.program_id, wt.name, wt.day_order, wt.notes, wt.created_at;
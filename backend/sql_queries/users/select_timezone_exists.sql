@@ -0,0 +1 @@
+SELECT EXISTS (SELECT 1 FROM pg_timezone_names WHERE name = %s);
\ No newline at end of file
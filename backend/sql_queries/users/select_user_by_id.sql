@@ -14,7 +14,11 @@ SELECT u.id,
     p.fitness_level,
     p.injuries,
     p.available_equipment,
-    p.preferred_workout_days
+    p.preferred_workout_days,
+    p.timezone,
+    COALESCE(l.current_streak_days, 0) AS current_streak_days,
+    COALESCE(l.longest_streak_days, 0) AS longest_streak_days
 FROM users u
     INNER JOIN profiles p ON u.id = p.user_id
+    LEFT JOIN leaderboard l ON u.id = l.user_id
 WHERE u.id = %s
\ No newline at end of file
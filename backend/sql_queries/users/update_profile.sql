@@ -6,6 +6,7 @@ SET name = COALESCE(%s, name),
     weight_lb = COALESCE(%s, weight_lb),
     goal_weight_lb = COALESCE(%s, goal_weight_lb),
     main_focus = COALESCE(%s, main_focus),
-    activity_intensity = COALESCE(%s, activity_intensity)
+    activity_intensity = COALESCE(%s, activity_intensity),
+    timezone = COALESCE(%s, timezone)
 WHERE user_id = %s
-RETURNING user_id, name, date_of_birth, gender, height_in, weight_lb, main_focus, goal_weight_lb, activity_intensity, fitness_level, injuries, available_equipment, preferred_workout_days;
\ No newline at end of file
+RETURNING user_id, name, date_of_birth, gender, height_in, weight_lb, main_focus, goal_weight_lb, activity_intensity, fitness_level, injuries, available_equipment, preferred_workout_days, timezone;
\ No newline at end of file
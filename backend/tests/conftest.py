@@ -0,0 +1,69 @@
+# API tests run against a real PostgreSQL database with full_schema.sql and
+# the migrations applied; set TEST_DATABASE_URL to enable them.
+
+import datetime
+import os
+import sys
+
+import jwt
+import psycopg2
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+JWT_SECRET = 'test-secret'
+
+
+@pytest.fixture(scope='session')
+def app():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+
+    from api.challenges import challenge_bp
+    from utils.db_pool import init_db_pool
+    from utils.sql_loader import init_sql_registry
+
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = JWT_SECRET
+    init_sql_registry(app)
+    init_db_pool(app)
+    app.register_blueprint(challenge_bp, url_prefix='/api/challenges')
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db():
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    conn.autocommit = True
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def user_id(db):
+    with db.cursor() as cur:
+        cur.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, 'x') RETURNING id",
+            (f"test_{os.getpid()}_{id(cur)}", f"test_{os.getpid()}_{id(cur)}@example.com")
+        )
+        user_id = cur.fetchone()[0]
+    yield user_id
+    with db.cursor() as cur:
+        cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
+
+
+@pytest.fixture
+def auth_headers(user_id):
+    token = jwt.encode(
+        {'user_id': user_id, 'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)},
+        JWT_SECRET, algorithm='HS256'
+    )
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,55 @@
+def _add_challenge(db, user_id, title, goal=30, progress=0):
+    with db.cursor() as cur:
+        cur.execute(
+            "INSERT INTO challenges (user_id, challenge_title, challenge_type, goal, current_progress, period_key) "
+            "VALUES (%s, %s, 'All-Time', %s, %s, 'all-time') RETURNING id",
+            (user_id, title, goal, progress)
+        )
+        return cur.fetchone()[0]
+
+
+def _progress(db, challenge_id):
+    with db.cursor() as cur:
+        cur.execute("SELECT current_progress FROM challenges WHERE id = %s", (challenge_id,))
+        return float(cur.fetchone()[0])
+
+
+def test_single_increment_rejects_auto_tracked(client, db, user_id, auth_headers):
+    tracked = _add_challenge(db, user_id, 'Centurion', goal=100)
+    manual = _add_challenge(db, user_id, 'App Explorer', goal=5)
+
+    response = client.put(f'/api/challenges/{tracked}', json={'increment': 1}, headers=auth_headers)
+    assert response.status_code == 409
+    assert _progress(db, tracked) == 0
+
+    response = client.put(f'/api/challenges/{manual}', json={'increment': 1}, headers=auth_headers)
+    assert response.status_code == 200
+    assert _progress(db, manual) == 1
+
+
+def test_batch_skips_auto_tracked(client, db, user_id, auth_headers):
+    tracked = _add_challenge(db, user_id, 'Centurion', goal=100)
+    manual = _add_challenge(db, user_id, 'App Explorer', goal=5)
+
+    response = client.put('/api/challenges/batch', json={'increments': [
+        {'challenge_id': tracked, 'increment': 2},
+        {'challenge_id': manual, 'increment': 2},
+    ]}, headers=auth_headers)
+    assert response.status_code == 200
+    statuses = {r['challenge_id']: r['status'] for r in response.get_json()['results']}
+    assert statuses == {tracked: 'auto_tracked', manual: 'updated'}
+    assert _progress(db, tracked) == 0
+    assert _progress(db, manual) == 2
+
+
+def test_batch_response_matches_get(client, db, user_id, auth_headers):
+    manual = _add_challenge(db, user_id, 'App Explorer', goal=5)
+
+    batch = client.put('/api/challenges/batch', json={'increments': [{'challenge_id': manual}]}, headers=auth_headers)
+    listed = client.get('/api/challenges/', headers=auth_headers)
+    assert batch.status_code == 200 and listed.status_code == 200
+
+    from_batch = next(c for c in batch.get_json()['challenges'] if c['id'] == manual)
+    from_get = next(c for c in listed.get_json()['challenges'] if c['id'] == manual)
+    assert from_batch == from_get
+    assert from_batch['current_progress'] == 1.0
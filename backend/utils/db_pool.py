@@ -0,0 +1,170 @@
+# Pooled PostgreSQL connections, one per request
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from flask import g, has_app_context
+from utils.sql_loader import prepare_statements, prepare_statements_enabled
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_settings = {}
+_pool_slots = None
+_pool_lock = threading.Lock()
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """Connection that stays open when a handler calls close() while it is
+    bound to a request; it is returned to the pool at app context teardown."""
+
+    _request_bound = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._request_bound:
+            return
+        super().close()
+
+
+def _get_pool():
+    """Creates the pool on first use, so every gunicorn worker gets its own.
+    Settings are read here rather than at import so .env has been loaded."""
+    global _pool, _pool_slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool_settings.update({
+                    'min_size': int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+                    'max_size': int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+                    'timeout': float(os.getenv("DB_POOL_TIMEOUT", 10)),
+                    # connections idle longer than this get a 'SELECT 1' before being handed out
+                    'healthcheck_after': float(os.getenv("DB_POOL_HEALTHCHECK_AFTER", 30)),
+                })
+                _pool_slots = threading.BoundedSemaphore(_pool_settings['max_size'])
+                _pool = ThreadedConnectionPool(
+                    _pool_settings['min_size'],
+                    _pool_settings['max_size'],
+                    os.getenv("DATABASE_URL"),
+                    connection_factory=PooledConnection
+                )
+    return _pool
+
+
+def _is_healthy(conn):
+    if conn.closed:
+        return False
+    if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+        return False
+    if time.monotonic() - conn._last_used < _pool_settings['healthcheck_after']:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _prepare(conn):
+    """PREPAREs the hot queries once per physical connection."""
+    conn._prepared_queries = {}
+    if not prepare_statements_enabled():
+        return
+    try:
+        prepare_statements(conn)
+    except psycopg2.Error as e:
+        # fall back to plain text queries on this connection
+        conn.rollback()
+        conn._prepared_queries = {}
+        logger.warning("Could not prepare statements, running queries unprepared: %s", e)
+
+
+def checkout_connection():
+    """Takes a healthy connection out of the pool, waiting up to DB_POOL_TIMEOUT
+    seconds for one to free up. Pair every call with checkin_connection()."""
+    pool = _get_pool()
+    if not _pool_slots.acquire(timeout=_pool_settings['timeout']):
+        raise PoolError("Timed out waiting for a database connection")
+    try:
+        for _ in range(_pool_settings['max_size'] + 1):
+            conn = pool.getconn()
+            if _is_healthy(conn):
+                if not hasattr(conn, '_prepared_queries'):
+                    _prepare(conn)
+                return conn
+            # broken connection: drop it and let the pool open a fresh one
+            pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Could not obtain a healthy database connection")
+    except Exception:
+        _pool_slots.release()
+        raise
+
+
+def checkin_connection(conn):
+    """Returns a connection to the pool, discarding it if it is unusable."""
+    conn._request_bound = False
+    discard = bool(conn.closed)
+    if not discard:
+        try:
+            # never hand out a connection with a half-finished transaction
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            discard = True
+    conn._last_used = time.monotonic()
+    try:
+        _get_pool().putconn(conn, close=discard)
+    finally:
+        _pool_slots.release()
+
+
+@contextmanager
+def pooled_connection():
+    """Pooled connection for code running outside a request (threads, CLI commands)."""
+    conn = checkout_connection()
+    try:
+        yield conn
+    finally:
+        checkin_connection(conn)
+
+
+def get_db_connection():
+    """Returns the connection bound to the current app context, checking one out
+    of the pool on first use. Outside an app context a standalone connection is
+    opened and close() disconnects it as before."""
+    if not has_app_context():
+        return psycopg2.connect(os.getenv("DATABASE_URL"))
+
+    conn = g.get('db_conn')
+    if conn is not None and conn.closed:
+        # the server dropped it mid-request; give the slot back before replacing it
+        release_db_connection()
+        conn = None
+    if conn is None:
+        conn = checkout_connection()
+        conn._request_bound = True
+        g.db_conn = conn
+    return conn
+
+
+def release_db_connection(exception=None):
+    """Returns the app context's connection to the pool (registered as a teardown)."""
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        checkin_connection(conn)
+
+
+def init_db_pool(app):
+    """Hooks the request-scoped connection into the app's teardown."""
+    app.teardown_appcontext(release_db_connection)
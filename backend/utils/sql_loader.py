@@ -1,15 +1,168 @@
-# Loads SQL files from '/sql_queries
+# Loads SQL files from '/sql_queries' (and its subfolders) once, at startup
 
+import logging
 import os
+import re
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
 
 SQL_DIR = 'sql_queries'
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# folders scanned for quoted .sql file names that must exist in the registry
+SOURCE_DIRS = ('api', 'services', 'utils')
+
+# statements run on (nearly) every request; each pooled connection PREPAREs
+# them once so later executions skip parse and plan
+PREPARED_QUERIES = (
+    'select_session_owner.sql',
+    'select_workout_session.sql',
+    'select_workout_sets.sql',
+    'select_user_sessions.sql',
+    'insert_workout_set.sql',
+    'update_workout_set.sql',
+    'verify_template_owner_by_id.sql',
+    'select_program_by_id.sql',
+    'select_program_tree.sql',
+    'select_template_exercises.sql',
+    'select_user_challenges.sql',
+    'select_current_challenge_types.sql',
+    'increment_challenge_progress.sql',
+    'apply_challenge_progress.sql',
+    'record_exercise_records.sql',
+    'select_exercise_records.sql',
+    'select_full_user_profile.sql',
+    'select_ai_user_workout_history.sql',
+    'select_user_strength_progress_ai.sql',
+    'select_recent_soreness.sql',
+    'select_ai_conversation_window.sql',
+)
+
+_queries = {}
+_SQL_REFERENCE = re.compile(r"""['"]([\w\-]+\.sql)['"]""")
+_PLACEHOLDER = re.compile(r'%%|%s')
+
+
+def load_sql_registry():
+    """Reads every .sql file under SQL_DIR into memory, keyed by file name.
+    Raises RuntimeError if two folders contain a file with the same name."""
+    queries = {}
+    locations = {}
+    for root, _, files in os.walk(os.path.join(BASE_DIR, SQL_DIR)):
+        for filename in sorted(files):
+            if not filename.endswith('.sql'):
+                continue
+            filepath = os.path.join(root, filename)
+            if filename in queries:
+                raise RuntimeError(
+                    f"Duplicate SQL file name '{filename}': {locations[filename]} and {filepath}"
+                )
+            with open(filepath, 'r') as f:
+                queries[filename] = f.read().strip()
+            locations[filename] = filepath
+
+    _queries.clear()
+    _queries.update(queries)
+    return _queries
+
+
+def validate_sql_references():
+    """Fails fast if code references a SQL file that is missing or empty."""
+    registry = _queries or load_sql_registry()
+    problems = []
+    for source_dir in SOURCE_DIRS:
+        for root, _, files in os.walk(os.path.join(BASE_DIR, source_dir)):
+            for filename in files:
+                if not filename.endswith('.py'):
+                    continue
+                filepath = os.path.join(root, filename)
+                with open(filepath, 'r') as f:
+                    for name in _SQL_REFERENCE.findall(f.read()):
+                        if not registry.get(name):
+                            problems.append(f"{name} (referenced in {os.path.relpath(filepath, BASE_DIR)})")
+    for name in PREPARED_QUERIES:
+        if not registry.get(name):
+            problems.append(f"{name} (listed in PREPARED_QUERIES)")
+    if problems:
+        raise RuntimeError("Missing or empty SQL files: " + ", ".join(sorted(set(problems))))
+
+
+def init_sql_registry(app):
+    """Loads and validates all SQL at app creation so bad references stop the boot."""
+    load_sql_registry()
+    validate_sql_references()
+    app.config['SQL_QUERY_COUNT'] = len(_queries)
+
+
 def load_sql_query(filename):
-    """Loads a SQL query from a file in the SQL_DIR."""
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    filepath = os.path.join(base_dir, SQL_DIR, filename)
-    try:
-        with open(filepath, 'r') as f:
-            return f.read().strip()
-    except FileNotFoundError: # if file not found
-        print(f"Error: SQL file not found at {filepath}")
-        return None
+    """Returns a SQL query from the in-memory registry."""
+    if not _queries:
+        load_sql_registry()
+    query = _queries.get(filename)
+    if query is None:
+        print(f"Error: SQL file not found in registry: {filename}")
+    return query
+
+
+# ==================== PREPARED STATEMENTS ====================
+
+def prepare_statements_enabled():
+    # transaction-mode poolers (e.g. Supabase on port 6543) don't keep session state
+    return os.getenv('DB_PREPARE_STATEMENTS', 'true').lower() in ('true', '1', 't')
+
+
+def _statement_name(filename):
+    return 'q_' + filename[:-len('.sql')].replace('-', '_')
+
+
+def _to_positional(query):
+    """Rewrites psycopg2 '%s' placeholders as '$1, $2, ...' for PREPARE."""
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        if match.group(0) == '%%':
+            return '%'
+        count += 1
+        return f'${count}'
+
+    return _PLACEHOLDER.sub(replace, query.rstrip().rstrip(';')), count
+
+
+def prepare_statements(conn):
+    """
+    PREPAREs every query in PREPARED_QUERIES on the connection, one statement at
+    a time: a query that fails to prepare (e.g. it needs a migration that has
+    not run yet) is logged and runs as plain text, the rest stay prepared.
+    Plans left on the session by an earlier run are dropped first.
+    """
+    if not _queries:
+        load_sql_registry()
+    param_counts = {}
+    with conn.cursor() as cur:
+        cur.execute("DEALLOCATE ALL")
+        conn.commit()
+        for filename in PREPARED_QUERIES:
+            query, count = _to_positional(_queries[filename])
+            try:
+                cur.execute(f"PREPARE {_statement_name(filename)} AS {query}")
+                conn.commit()
+            except psycopg2.Error as e:
+                conn.rollback()
+                logger.warning("Could not prepare %s, running it unprepared: %s", filename, e)
+                continue
+            param_counts[filename] = count
+    conn._prepared_queries = param_counts
+
+
+def execute_query(cur, filename, params=None):
+    """Executes a registry query, using the connection's prepared statement when it has one."""
+    param_counts = getattr(cur.connection, '_prepared_queries', None)
+    if param_counts and filename in param_counts:
+        placeholders = ", ".join(['%s'] * param_counts[filename])
+        args = f"({placeholders})" if placeholders else ""
+        cur.execute(f"EXECUTE {_statement_name(filename)}{args}", params)
+    else:
+        cur.execute(load_sql_query(filename), params)
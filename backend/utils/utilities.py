@@ -1,14 +1,7 @@
 from flask import jsonify, request, current_app
-import psycopg2
 import jwt                      # Encode / Decode
 from functools import wraps
-import os
-
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-def get_db_connection():
-    conn = psycopg2.connect(DATABASE_URL)
-    return conn
+from utils.db_pool import get_db_connection
 
 def token_required(f):
     @wraps(f)
@@ -58,8 +51,4 @@ def token_required(f):
             kwargs['user_id'] = user_id
         return f(*args, **kwargs)
 
-    return decorated
-
-def get_db_connection():
-    conn = psycopg2.connect(DATABASE_URL)
-    return conn
\ No newline at end of file
+    return decorated
\ No newline at end of file
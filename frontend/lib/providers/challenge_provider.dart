@@ -11,6 +11,8 @@ class Challenge {
   final IconData icon;
   final Color color;
   bool completed;
+  // Advanced by the server from logged workouts; not incremented by hand
+  bool autoTracked;
 
   Challenge({
     this.id,
@@ -22,6 +24,7 @@ class Challenge {
     required this.icon,
     required this.color,
     this.completed = false,
+    this.autoTracked = false,
   });
 
   double get progressPercentage => (progress / goal).clamp(0.0, 1.0);
@@ -42,6 +45,7 @@ class Challenge {
       icon: localMetaData['icon'] as IconData,
       color: localMetaData['color'] as Color,
       completed: json['is_completed'] as bool,
+      autoTracked: json['auto_tracked'] as bool? ?? false,
     );
   }
 }
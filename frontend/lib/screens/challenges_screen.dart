@@ -255,8 +255,9 @@ class _ChallengesState extends State<Challenges> {
                 (c) => ChallengeCard(
                   challenge: c,
                   onTap: () {
-                    // Prevent interaction with the master achievement or completed challenges
-                    if (c.title == "Journey Master" || c.completed) {
+                    // Prevent interaction with the master achievement, completed challenges
+                    // and challenges the server advances from logged workouts
+                    if (c.title == "Journey Master" || c.completed || c.autoTracked) {
                       return;
                     }
 
@@ -94,6 +94,9 @@ class AiService {
   final _storage = const FlutterSecureStorage();
   List<ConversationMessage> conversationHistory = [];
   bool _isInitialized = false;
+  // The server keeps the thread; the client only sends its id with each message
+  int? conversationId;
+  bool _startNewConversation = false;
 
   Future<String?> getToken() async {
     return await _storage.read(key: 'auth_token');
@@ -122,6 +125,8 @@ class AiService {
               ?.map((msg) => ConversationMessage.fromJson(msg))
               .toList() ?? [];
           conversationHistory = messages;
+          conversationId = responseBody['conversation_id'] as int?;
+          _startNewConversation = false;
           _isInitialized = true;
           return messages;
         } else {
@@ -186,11 +191,6 @@ class AiService {
       throw Exception('Authentication token not found.');
     }
 
-    // Prepare conversation history in format expected by backend
-    final historyForBackend = conversationHistory
-        .map((msg) => {'role': msg.role, 'content': msg.content})
-        .toList();
-
     final response = await http.post(
       Uri.parse('${ApiService.ai()}/chat'),
       headers: <String, String>{
@@ -199,7 +199,8 @@ class AiService {
       },
       body: jsonEncode({
         'message': message,
-        'conversation_history': historyForBackend,
+        if (conversationId != null) 'conversation_id': conversationId,
+        if (conversationId == null && _startNewConversation) 'new_conversation': true,
       }),
     );
 
@@ -207,6 +208,8 @@ class AiService {
       final responseBody = jsonDecode(response.body);
       if (responseBody['success'] == true) {
         final aiResponse = responseBody['response'] as String;
+        conversationId = responseBody['conversation_id'] as int? ?? conversationId;
+        _startNewConversation = false;
         
         // Note: The screen handles adding messages to conversationHistory
         // This method only handles the API communication
@@ -219,9 +222,11 @@ class AiService {
     }
   }
 
-  /// Clear conversation history locally
+  /// Clear conversation history locally; the next message starts a new conversation
   Future<void> clearConversationHistory() async {
     conversationHistory.clear();
+    conversationId = null;
+    _startNewConversation = true;
   }
 
   /// Get current conversation history
@@ -355,6 +360,8 @@ class AiService {
         final responseBody = jsonDecode(response.body);
         if (responseBody['success'] == true) {
           conversationHistory.clear();
+          conversationId = null;
+          _startNewConversation = true;
           return responseBody['deleted_count'] as int? ?? 0;
         } else {
           throw Exception('Failed to delete conversations: ${responseBody['error']}');
@@ -42,6 +42,7 @@ class ChallengeService {
         newAllTime.firstWhere((c) => c.title == fetched.title);
         localChallenge.progress = fetched.progress;
         localChallenge.completed = fetched.completed;
+        localChallenge.autoTracked = fetched.autoTracked;
         localChallenge.id = fetched.id;
       } catch (e) {
         // ignore: avoid_print
@@ -89,6 +90,7 @@ class ChallengeManager {
       color: c.color,
       progress: c.progress,
       completed: c.completed,
+      autoTracked: c.autoTracked,
     );
   }
 
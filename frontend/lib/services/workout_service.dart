@@ -536,58 +536,24 @@ class WorkoutService {
 
   // ==================== WORKOUT TEMPLATES ====================
 
-  /// Fetch all templates for a program
+  /// Fetch all templates for a program, with their exercises, in one request
   static Future<List<WorkoutTemplate>> getTemplatesForProgram(int programId) async {
     try {
       final token = await _authService.getToken();
       if (token == null) throw Exception('No auth token');
 
       final response = await http.get(
-        Uri.parse('${ApiService.workouts()}/programs/$programId/templates'),
+        Uri.parse('${ApiService.workouts()}/programs/$programId/tree'),
         headers: {'Authorization': 'Bearer $token'},
       );
 
       if (response.statusCode == 200) {
         final body = jsonDecode(response.body) as Map<String, dynamic>;
         debugPrint('DEBUG: getTemplatesForProgram response: $body');
-        if (body['success'] == true && body['templates'] != null) {
-          final data = body['templates'] as List;
+        if (body['success'] == true && body['program'] != null) {
+          final data = (body['program']['templates'] as List?) ?? [];
           final templates = data.map((t) => WorkoutTemplate.fromJson(t)).toList();
-          
-          // Fetch exercises for each template
-          for (int i = 0; i < templates.length; i++) {
-            final template = templates[i];
-            try {
-              final exercisesResponse = await http.get(
-                Uri.parse('${ApiService.workouts()}/templates/${template.id}/exercises'),
-                headers: {'Authorization': 'Bearer $token'},
-              );
-              
-              if (exercisesResponse.statusCode == 200) {
-                final exercisesBody = jsonDecode(exercisesResponse.body) as Map<String, dynamic>;
-                if (exercisesBody['success'] == true && exercisesBody['exercises'] != null) {
-                  final exercisesData = exercisesBody['exercises'] as List;
-                  final exercises = exercisesData.map((e) => TemplateExercise.fromJson(e, defaultTemplateId: template.id)).toList();
-                  
-                  // Replace template in the list with one that has exercises
-                  templates[i] = WorkoutTemplate(
-                    id: template.id,
-                    programId: template.programId,
-                    name: template.name,
-                    dayOrder: template.dayOrder,
-                    notes: template.notes,
-                    createdAt: template.createdAt,
-                    exercises: exercises,
-                  );
-                  debugPrint('DEBUG: Loaded ${exercises.length} exercises for template ${template.name}');
-                }
-              }
-            } catch (e) {
-              debugPrint('DEBUG: Error loading exercises for template ${template.id}: $e');
-              // Continue anyway - template just won't have exercises
-            }
-          }
-          
+
           debugPrint('DEBUG: Parsed ${templates.length} templates');
           for (var template in templates) {
             debugPrint('DEBUG: Template ${template.name} has ${template.exercises.length} exercises');